@@ -0,0 +1,161 @@
+"""Admission control for expensive route classes.
+
+Each ``RouteClass`` (logins, uploads, reports, ...) gets a concurrency limit
+and a bounded wait queue. A request that finds the queue full is rejected at
+once with 429; one that waits longer than ``queue_timeout`` gets 503. Both carry
+a ``Retry-After`` estimated from the class's recent service time.
+
+Routes outside every class, which includes the public /api/cms/ reads, are
+never queued. While the event loop is lagging, classified requests are shed
+with 503 before they start, so the cheap public reads keep the worker.
+"""
+import asyncio
+import json
+import math
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class RouteClass:
+    def __init__(self, name: str, routes: Iterable[Tuple[str, str]], concurrency: int,
+                 queue_size: int, queue_timeout: float):
+        self.name = name
+        self.routes = [(method.upper(), prefix) for method, prefix in routes]
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.avg_service_seconds = 0.0
+        self.stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0, "shed": 0}
+
+    @classmethod
+    def from_env(cls, name: str, routes: Iterable[Tuple[str, str]], concurrency: int,
+                 queue_size: int, queue_timeout: float) -> "RouteClass":
+        prefix = f"ADMISSION_{name.upper()}_"
+        return cls(
+            name,
+            routes,
+            concurrency=int(os.getenv(prefix + "CONCURRENCY", str(concurrency))),
+            queue_size=int(os.getenv(prefix + "QUEUE", str(queue_size))),
+            queue_timeout=float(os.getenv(prefix + "TIMEOUT_SECONDS", str(queue_timeout))),
+        )
+
+    def matches(self, method: str, path: str) -> bool:
+        return any(m in ("*", method) and path.startswith(prefix) for m, prefix in self.routes)
+
+    def retry_after(self) -> int:
+        # Time for the requests ahead of this one to drain through the available slots
+        estimate = self.avg_service_seconds * (self.waiting + self.in_flight + 1) / self.concurrency
+        return max(1, math.ceil(estimate))
+
+    async def acquire(self) -> Optional[int]:
+        """None once admitted, otherwise the status code to reject with."""
+        if self._semaphore.locked():
+            if self.waiting >= self.queue_size:
+                self.stats["rejected_queue_full"] += 1
+                return 429
+            self.stats["queued"] += 1
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.stats["rejected_timeout"] += 1
+                return 503
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self.in_flight += 1
+        self.stats["admitted"] += 1
+        return None
+
+    def release(self, service_seconds: float):
+        self.in_flight -= 1
+        self._semaphore.release()
+        # Exponentially weighted, so Retry-After follows the current cost of the route
+        self.avg_service_seconds = service_seconds if not self.avg_service_seconds else (
+            0.8 * self.avg_service_seconds + 0.2 * service_seconds)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "avg_service_ms": round(self.avg_service_seconds * 1000, 2),
+        }
+
+
+class AdmissionController:
+    def __init__(self, classes: List[RouteClass], max_loop_lag_ms: float, lag_interval: float = 0.1):
+        self.classes = classes
+        self.max_loop_lag_ms = max_loop_lag_ms
+        self.lag_interval = lag_interval
+        self.loop_lag_ms = 0.0
+
+    def classify(self, method: str, path: str) -> Optional[RouteClass]:
+        return next((route_class for route_class in self.classes if route_class.matches(method, path)), None)
+
+    async def monitor_loop_lag(self):
+        # A sleep that wakes up late means callbacks are queueing on the event loop
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.lag_interval)
+            lag = (time.perf_counter() - started - self.lag_interval) * 1000
+            self.loop_lag_ms = 0.5 * self.loop_lag_ms + 0.5 * max(lag, 0.0)
+
+    def overloaded(self) -> bool:
+        return self.loop_lag_ms > self.max_loop_lag_ms
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "loop_lag_ms": round(self.loop_lag_ms, 2),
+            "max_loop_lag_ms": self.max_loop_lag_ms,
+            "classes": {route_class.name: route_class.metrics() for route_class in self.classes},
+        }
+
+
+class AdmissionMiddleware:
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        route_class = None
+        if scope["type"] == "http" and scope["method"] != "OPTIONS":
+            route_class = self.controller.classify(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self.controller.overloaded():
+            route_class.stats["shed"] += 1
+            await self.reject(send, 503, route_class)
+            return
+        status_code = await route_class.acquire()
+        if status_code is not None:
+            await self.reject(send, status_code, route_class)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route_class.release(time.perf_counter() - started)
+
+    async def reject(self, send, status_code: int, route_class: RouteClass):
+        detail = "Too many concurrent requests, retry later" if status_code == 429 else "Server busy, retry later"
+        body = json.dumps({"detail": detail}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(route_class.retry_after()).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
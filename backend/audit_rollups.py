@@ -0,0 +1,114 @@
+"""Pre-aggregated audit activity rollups.
+
+Every audit entry increments one hourly and one daily counter document keyed
+by (bucket, section, action, user_email), so activity dashboards read a
+number of documents bounded by the time range and the number of editors,
+never the raw audit_logs volume.
+
+Usage:
+    python audit_rollups.py --rebuild     # regenerate rollups from raw audit_logs
+"""
+import argparse
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from pymongo import IndexModel, UpdateOne
+
+# Bucket keys are prefixes of the ISO timestamps log_audit writes
+GRANULARITIES = {"hour": 13, "day": 10}  # "2025-10-19T13", "2025-10-19"
+DIMENSIONS = ("section", "action", "user_email")
+
+INDEXES = [
+    IndexModel([("granularity", 1), ("bucket", 1), ("section", 1), ("action", 1), ("user_email", 1)], unique=True),
+]
+
+
+async def record(db, entry: Dict[str, Any]):
+    timestamp = entry["timestamp"]
+    operations = [
+        UpdateOne(
+            {"granularity": granularity, "bucket": timestamp[:length],
+             **{dimension: entry.get(dimension) for dimension in DIMENSIONS}},
+            {"$inc": {"count": 1}},
+            upsert=True,
+        )
+        for granularity, length in GRANULARITIES.items()
+    ]
+    await db.audit_rollups.bulk_write(operations, ordered=False)
+
+
+async def query(db, granularity: str, bucket_from: Optional[str] = None, bucket_to: Optional[str] = None,
+                filters: Optional[Dict[str, str]] = None, group_by: List[str] = ()) -> Dict[str, Any]:
+    match: Dict[str, Any] = {"granularity": granularity}
+    if bucket_from or bucket_to:
+        match["bucket"] = {}
+        if bucket_from:
+            match["bucket"]["$gte"] = bucket_from[:GRANULARITIES[granularity]]
+        if bucket_to:
+            # Inclusive prefix: "2025-10-01" must also match the hourly "2025-10-01T23",
+            # so compare against the next prefix ("2025-10-02") instead
+            upper = bucket_to[:GRANULARITIES[granularity]]
+            match["bucket"]["$lt"] = upper[:-1] + chr(ord(upper[-1]) + 1)
+    match.update({key: value for key, value in (filters or {}).items() if value})
+
+    group_id = {"bucket": "$bucket", **{dimension: f"${dimension}" for dimension in group_by}}
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": group_id, "count": {"$sum": "$count"}}},
+        {"$sort": {"_id.bucket": 1}},
+    ]
+    series = [{**row["_id"], "count": row["count"]} async for row in db.audit_rollups.aggregate(pipeline)]
+    return {
+        "granularity": granularity,
+        "group_by": list(group_by),
+        "total": sum(row["count"] for row in series),
+        "series": series,
+    }
+
+
+async def rebuild(db) -> int:
+    """Regenerate every rollup from raw audit_logs into a scratch collection, then swap it in."""
+    scratch = "audit_rollups_rebuild"
+    await db[scratch].drop()
+    for granularity, length in GRANULARITIES.items():
+        pipeline = [
+            {"$match": {"timestamp": {"$type": "string"}}},
+            {"$group": {
+                "_id": {"bucket": {"$substrBytes": ["$timestamp", 0, length]},
+                        **{dimension: f"${dimension}" for dimension in DIMENSIONS}},
+                "count": {"$sum": 1},
+            }},
+            {"$project": {"_id": 0, "granularity": {"$literal": granularity}, "bucket": "$_id.bucket",
+                          **{dimension: f"$_id.{dimension}" for dimension in DIMENSIONS}, "count": 1}},
+        ]
+        batch = []
+        async for row in db.audit_logs.aggregate(pipeline, allowDiskUse=True):
+            batch.append(row)
+            if len(batch) >= 1000:
+                await db[scratch].insert_many(batch)
+                batch = []
+        if batch:
+            await db[scratch].insert_many(batch)
+    await db[scratch].create_indexes(INDEXES)
+    count = await db[scratch].count_documents({})
+    if count:
+        await db[scratch].rename("audit_rollups", dropTarget=True)
+    else:
+        await db.audit_rollups.delete_many({})
+    return count
+
+
+async def main():
+    import server
+
+    count = await rebuild(server.db)
+    print(f"✅ Rebuilt {count} audit rollup documents")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit activity rollups")
+    parser.add_argument("--rebuild", action="store_true", help="regenerate rollups from raw audit_logs")
+    if parser.parse_args().rebuild:
+        asyncio.run(main())
+    else:
+        parser.print_help()
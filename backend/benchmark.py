@@ -0,0 +1,319 @@
+"""Load and benchmark suite for the AHAM CMS API.
+
+Runs a weighted mix of realistic traffic against a running API (backed by a
+local mongod) and reports throughput and p50/p95/p99 latency per route.
+Results are written as JSON so they can be stored as baselines and compared
+against later runs.
+
+Examples:
+    python benchmark.py --seed                          # seed with seed_data.py first
+    python benchmark.py --scale 5000 --mix public       # add 5000 synthetic docs per content collection
+    python benchmark.py --save-baseline                 # store results as the baseline
+    python benchmark.py --compare                       # fail if a route regressed
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+from PIL import Image
+
+API_URL = os.getenv("BENCH_API_URL", "http://localhost:8001")
+MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
+ADMIN_EMAIL = os.getenv("BENCH_ADMIN_EMAIL", "admin@ahamhfc.com")
+ADMIN_PASSWORD = os.getenv("BENCH_ADMIN_PASSWORD", "admin123")
+BASELINE_DIR = Path(__file__).parent / "benchmark_baselines"
+BENCH_MARKER = "[bench]"
+# Run id for the --scale dataset, so cleanup never touches data made with synthetic_data.py
+BENCH_SYNTHETIC_RUN = "benchmark"
+
+PUBLIC_HOMEPAGE_ROUTES = [
+    "/api/cms/banners",
+    "/api/cms/products",
+    "/api/cms/testimonials",
+    "/api/cms/about-stats",
+    "/api/cms/footer",
+    "/api/cms/emi-calculator",
+]
+
+# Scenario weights per traffic mix
+MIXES = {
+    "public": {"homepage": 70, "articles": 30},
+    "mixed": {"homepage": 55, "articles": 25, "admin_crud": 10, "login": 5, "media_upload": 5},
+    "admin": {"admin_crud": 50, "login": 20, "media_upload": 20, "articles": 10},
+}
+
+# ===== RESULT RECORDING =====
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+
+    def record(self, route: str, elapsed: float, ok: bool):
+        with self._lock:
+            self.samples.setdefault(route, []).append(elapsed)
+            if not ok:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(values, errors: int, duration: float) -> dict:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / duration, 2) if duration else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+    }
+
+# ===== SCENARIOS =====
+
+class Client:
+    def __init__(self, base_url: str, recorder: Recorder):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.session = requests.Session()
+        self.token = None
+
+    def call(self, method: str, route: str, path: str = None, **kwargs):
+        headers = kwargs.pop("headers", {})
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + (path or route), headers=headers, timeout=30, **kwargs)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        self.recorder.record(f"{method} {route}", time.perf_counter() - start, ok)
+        return response
+
+    def login(self):
+        response = self.call("POST", "/api/admin/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+        if response is not None and response.status_code == 200:
+            self.token = response.json()["access_token"]
+        return self.token
+
+def make_image(rng: random.Random) -> bytes:
+    width, height = rng.choice([(800, 600), (1600, 900), (2400, 1600)])
+    image = Image.new("RGB", (width, height), tuple(rng.randrange(256) for _ in range(3)))
+    # Noise band so the encoder does real work instead of compressing a flat colour
+    noise = Image.effect_noise((width, height // 4), 64).convert("RGB")
+    image.paste(noise, (0, 0))
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+def scenario_homepage(client: Client, rng: random.Random):
+    for route in PUBLIC_HOMEPAGE_ROUTES:
+        client.call("GET", route)
+
+def scenario_articles(client: Client, rng: random.Random):
+    client.call("GET", "/api/cms/articles")
+
+def scenario_admin_crud(client: Client, rng: random.Random):
+    banner = {
+        "title_en": f"{BENCH_MARKER} Banner {rng.randrange(10**6)}",
+        "title_ta": "வீட்டுக் கடன்",
+        "subtitle_en": "Benchmark banner",
+        "subtitle_ta": "சோதனை பேனர்",
+        "cta_text_en": "Apply Now",
+        "cta_text_ta": "இப்போது விண்ணப்பிக்கவும்",
+        "cta_action": "enquiry",
+        "image_url": "/uploads/bench.webp",
+        "highlights": ["Quick Approval"],
+        "order_index": 1000,
+        "status": False,
+    }
+    client.call("GET", "/api/admin/banners")
+    response = client.call("POST", "/api/admin/banners", json=banner)
+    if response is None or response.status_code != 200:
+        return
+    banner_id = response.json()["id"]
+    banner["subtitle_en"] = "Benchmark banner (edited)"
+    client.call("PUT", "/api/admin/banners/{id}", f"/api/admin/banners/{banner_id}", json=banner)
+    client.call("DELETE", "/api/admin/banners/{id}", f"/api/admin/banners/{banner_id}")
+
+def scenario_login(client: Client, rng: random.Random):
+    Client(client.base_url, client.recorder).login()
+
+def scenario_media_upload(client: Client, rng: random.Random):
+    files = {"file": (f"bench_{rng.randrange(10**6)}.jpg", make_image(rng), "image/jpeg")}
+    response = client.call("POST", "/api/admin/media/upload", files=files)
+    if response is not None and response.status_code == 200:
+        media_id = response.json()["_id"]
+        client.call("DELETE", "/api/admin/media/{id}", f"/api/admin/media/{media_id}")
+
+SCENARIOS = {
+    "homepage": scenario_homepage,
+    "articles": scenario_articles,
+    "admin_crud": scenario_admin_crud,
+    "login": scenario_login,
+    "media_upload": scenario_media_upload,
+}
+
+# ===== DATA SETUP =====
+
+async def prepare_data(seed: bool, scale: int, rng_seed: int):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    import synthetic_data
+
+    if seed:
+        import seed_data
+        await seed_data.main()
+
+    db = AsyncIOMotorClient(MONGO_URL).aham_cms
+    await cleanup_data(db)
+    if scale:
+        counts = {collection: scale for collection in synthetic_data.CONTENT_COLLECTIONS}
+        await synthetic_data.populate(db, counts, rng_seed=rng_seed, progress=synthetic_data.print_progress,
+                                      run=BENCH_SYNTHETIC_RUN)
+
+async def cleanup_data(db):
+    import synthetic_data
+
+    marker = {"$regex": f"^{re.escape(BENCH_MARKER)}"}
+    await db.banners.delete_many({"title_en": marker})
+    await synthetic_data.purge(db, synthetic_data.CONTENT_COLLECTIONS, run=BENCH_SYNTHETIC_RUN)
+
+# ===== RUNNER =====
+
+def run_load(base_url: str, mix: str, concurrency: int, duration: float, rng_seed: int) -> dict:
+    recorder = Recorder()
+    weights = MIXES[mix]
+    names, counts = list(weights), list(weights.values())
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_id: int):
+        rng = random.Random(rng_seed * 1000 + worker_id)
+        client = Client(base_url, recorder)
+        if not client.login():
+            raise RuntimeError(f"Admin login failed for {ADMIN_EMAIL}")
+        while time.perf_counter() < deadline:
+            SCENARIOS[rng.choices(names, counts)[0]](client, rng)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker, i) for i in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    routes = {route: summarize(values, recorder.errors.get(route, 0), elapsed)
+              for route, values in sorted(recorder.samples.items())}
+    all_values = [v for values in recorder.samples.values() for v in values]
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "api_url": base_url,
+            "mix": mix,
+            "concurrency": concurrency,
+            "duration_s": round(elapsed, 2),
+            "seed": rng_seed,
+        },
+        "total": summarize(all_values, sum(recorder.errors.values()), elapsed),
+        "routes": routes,
+    }
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_report(results: dict):
+    meta = results["meta"]
+    print(f"Mix: {meta['mix']}  concurrency: {meta['concurrency']}  duration: {meta['duration_s']}s")
+    print(f"{'route':<42}{'count':>8}{'err':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = list(results["routes"].items()) + [("TOTAL", results["total"])]
+    for route, stats in rows:
+        print(f"{route:<42}{stats['count']:>8}{stats['errors']:>6}{stats['throughput_rps']:>10}"
+              f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return human-readable regressions of results against a baseline."""
+    regressions = []
+    for route, base in baseline["routes"].items():
+        current = results["routes"].get(route)
+        if not current or not base["count"]:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if base[metric] and current[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{route}: {metric} {base[metric]} -> {current[metric]}")
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{route}: throughput_rps {base['throughput_rps']} -> {current['throughput_rps']}")
+        if current["errors"] > base["errors"]:
+            regressions.append(f"{route}: errors {base['errors']} -> {current['errors']}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the AHAM CMS API")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--seed", action="store_true", help="run seed_data.py before the benchmark")
+    parser.add_argument("--scale", type=int, default=0, help="synthetic documents per content collection")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="write results JSON to this path")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="compare with the stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative regression")
+    parser.add_argument("--keep-data", action="store_true", help="keep synthetic documents after the run")
+    args = parser.parse_args()
+
+    if args.seed or args.scale:
+        asyncio.run(prepare_data(args.seed, args.scale, args.random_seed))
+
+    try:
+        results = run_load(args.url, args.mix, args.concurrency, args.duration, args.random_seed)
+    finally:
+        if args.scale and not args.keep_data:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            asyncio.run(cleanup_data(AsyncIOMotorClient(MONGO_URL).aham_cms))
+
+    results["meta"]["scale"] = args.scale
+    print_report(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    baseline_path = BASELINE_DIR / f"{args.mix}.json"
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2))
+        print(f"✅ Baseline saved to {baseline_path}")
+    if args.compare:
+        if not baseline_path.exists():
+            sys.exit(f"No baseline at {baseline_path}; run with --save-baseline first")
+        regressions = compare(results, json.loads(baseline_path.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"❌ {line}")
+        if regressions:
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Single-flight cache for public reads.
+
+Concurrent requests for the same key share one in-flight load (and its
+serialized result) instead of each issuing an identical Mongo query. Fresh
+entries are served from memory for ``ttl`` seconds; for a further
+``stale_ttl`` seconds an expired entry is still served while exactly one
+background refresh runs, so expiry never turns into a query stampede.
+Keys are ``(section, variant)`` tuples and ``invalidate(section)`` drops every
+variant of a section after an admin edit.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlightCache:
+    def __init__(self, ttl: float, stale_ttl: float):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: Dict[Hashable, Tuple[Any, float]] = {}
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._generations: Dict[Hashable, int] = {}
+        self.stats = {"requests": 0, "hits": 0, "loads": 0, "coalesced": 0, "stale_served": 0, "errors": 0}
+
+    async def get(self, key: Tuple[Hashable, ...], loader: Callable[[], Awaitable[Any]]) -> Any:
+        self.stats["requests"] += 1
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry and now < entry[1]:
+            self.stats["hits"] += 1
+            return entry[0]
+
+        stale = entry is not None and now < entry[1] + self.stale_ttl
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader))
+            # Mark failures as retrieved; background refreshes may have no awaiting request
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+            self.stats["loads"] += 1
+        elif not stale:
+            self.stats["coalesced"] += 1
+
+        if stale:
+            # Serve the expired value while a single refresh runs in the background
+            self.stats["stale_served"] += 1
+            return entry[0]
+        # shield() keeps a cancelled request from cancelling the load other requests share
+        return await asyncio.shield(task)
+
+    async def _load(self, key, loader):
+        generation = self._generations.get(key[0], 0)
+        try:
+            value = await loader()
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            # After an invalidation the key may already belong to a newer load
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+        # A load that raced with an invalidation must not repopulate the cache with old data
+        if self._generations.get(key[0], 0) == generation:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+        return value
+
+    def invalidate(self, section: Hashable):
+        self._generations[section] = self._generations.get(section, 0) + 1
+        for key in [key for key in self._entries if key[0] == section]:
+            del self._entries[key]
+        # Loads started before the edit still finish for their waiters, but later requests start afresh
+        for key in [key for key in self._inflight if key[0] == section]:
+            del self._inflight[key]
+
+    def metrics(self) -> Dict[str, Any]:
+        requests = self.stats["requests"]
+        saved = self.stats["hits"] + self.stats["coalesced"] + self.stats["stale_served"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "coalescing_ratio": round(self.stats["coalesced"] / requests, 4) if requests else 0.0,
+            "db_queries_saved_ratio": round(saved / requests, 4) if requests else 0.0,
+        }
@@ -0,0 +1,137 @@
+"""Negotiated brotli/gzip compression for API responses.
+
+Unlike Starlette's GZipMiddleware this one also speaks brotli and keeps an
+LRU of compressed bodies for cacheable paths, keyed by a digest of the
+uncompressed body. Identical public payloads (the same content version) are
+therefore compressed once and then served from memory. Streaming responses
+and bodies that already carry a Content-Encoding pass through untouched.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def choose_encoding(accept_encoding: str, available: Tuple[str, ...] = ("br", "gzip")) -> Optional[str]:
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[coding.strip()] = q
+    if "br" in available and brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if "gzip" in available and offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str, cached: bool) -> bytes:
+    # Cached bodies are compressed once, so they can afford the slower, denser settings
+    if encoding == "br":
+        return brotli.compress(body, quality=9 if cached else 4)
+    return gzip.compress(body, compresslevel=9 if cached else 6, mtime=0)
+
+
+class CompressedBodyCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compress(self, body: bytes, encoding: str) -> bytes:
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compressed
+            self.misses += 1
+        compressed = compress(body, encoding, cached=True)
+        with self._lock:
+            self._entries[key] = compressed
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compressed
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, cache_entries: int = 256,
+                 cached_path_prefixes: Tuple[str, ...] = ("/api/cms/",)):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cached_path_prefixes = cached_path_prefixes
+        self.cache = CompressedBodyCache(cache_entries)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        use_cache = scope["method"] == "GET" and scope["path"].startswith(self.cached_path_prefixes)
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            response_headers = [(k.lower(), v) for k, v in start_message.get("headers", [])]
+            content_type = next((v for k, v in response_headers if k == b"content-type"), b"").decode("latin-1")
+            body = message.get("body", b"")
+            skip = (
+                message.get("more_body", False)
+                or any(k == b"content-encoding" for k, _ in response_headers)
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+                or len(body) < self.minimum_size
+            )
+            if skip:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if use_cache and start_message["status"] == 200:
+                compressed = self.cache.get_or_compress(body, encoding)
+            else:
+                compressed = compress(body, encoding, cached=False)
+            new_headers = [(k, v) for k, v in response_headers if k not in (b"content-length", b"vary")]
+            vary = [v for k, v in response_headers if k == b"vary"]
+            new_headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+            new_headers.append((b"content-encoding", encoding.encode("latin-1")))
+            new_headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+            await send({**start_message, "headers": new_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,120 @@
+"""Eligibility scorecard engine.
+
+Admin-edited ``EligibilityQuestion.score_map`` entries are compiled once into
+lookup tables: categorical answers (select/radio/text) become a dict keyed by
+the normalized option, numeric answers become a list of intervals parsed
+from keys such as ``"25000-50000"``, ``">=50000"``, ``"<25000"`` or ``"60+"``.
+"""
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+NUMBER_PATTERN = r"-?\d+(?:\.\d+)?"
+RANGE_RE = re.compile(rf"^({NUMBER_PATTERN})\s*(?:-|to)\s*({NUMBER_PATTERN})$")
+BOUND_RE = re.compile(rf"^(>=|<=|>|<)\s*({NUMBER_PATTERN})$")
+PLUS_RE = re.compile(rf"^({NUMBER_PATTERN})\s*\+$")
+
+BANDS = [(75.0, "high"), (50.0, "medium"), (0.0, "low")]
+
+
+def normalize(value: Any) -> str:
+    return str(value).strip().lower()
+
+
+def parse_interval(key: str) -> Optional[Tuple[float, float, bool, bool]]:
+    """Parse a numeric score_map key into (low, high, low_inclusive, high_inclusive)."""
+    key = key.strip().replace(",", "")
+    match = RANGE_RE.match(key)
+    if match:
+        return float(match.group(1)), float(match.group(2)), True, True
+    match = BOUND_RE.match(key)
+    if match:
+        op, bound = match.group(1), float(match.group(2))
+        if op.startswith(">"):
+            return bound, math.inf, op == ">=", False
+        return -math.inf, bound, False, op == "<="
+    match = PLUS_RE.match(key)
+    if match:
+        return float(match.group(1)), math.inf, True, False
+    try:
+        value = float(key)
+    except ValueError:
+        return None
+    return value, value, True, True
+
+
+class CompiledQuestion:
+    __slots__ = ("id", "question_type", "choices", "intervals", "max_score")
+
+    def __init__(self, question: Dict[str, Any]):
+        self.id = str(question["_id"])
+        self.question_type = question.get("question_type", "select")
+        score_map = question.get("score_map") or {}
+        self.choices = {normalize(key): int(score) for key, score in score_map.items()}
+        self.intervals = []
+        if self.question_type == "number":
+            for key, score in score_map.items():
+                interval = parse_interval(key)
+                if interval:
+                    self.intervals.append((*interval, int(score)))
+            self.intervals.sort(key=lambda interval: interval[0])
+        self.max_score = max(self.choices.values(), default=0)
+
+    def score(self, answer: Any) -> int:
+        if answer is None or answer == "":
+            return 0
+        if isinstance(answer, list):
+            # No question type takes several answers; scoring the best one keeps a list within max_score
+            return max((self.score(item) for item in answer), default=0)
+        if self.intervals:
+            try:
+                value = float(str(answer).replace(",", ""))
+            except ValueError:
+                return 0
+            for low, high, low_inclusive, high_inclusive, score in self.intervals:
+                above = value >= low if low_inclusive else value > low
+                below = value <= high if high_inclusive else value < high
+                if above and below:
+                    return score
+            return 0
+        return self.choices.get(normalize(answer), 0)
+
+
+class EligibilityScorer:
+    def __init__(self, questions: Iterable[Dict[str, Any]] = ()):
+        self.questions: List[CompiledQuestion] = [CompiledQuestion(q) for q in questions]
+        self.max_score = sum(q.max_score for q in self.questions)
+
+    def score(self, answers: Dict[str, Any]) -> Dict[str, Any]:
+        breakdown = {q.id: q.score(answers.get(q.id)) for q in self.questions}
+        total = sum(breakdown.values())
+        percentage = round(total * 100.0 / self.max_score, 2) if self.max_score else 0.0
+        return {
+            "score": total,
+            "max_score": self.max_score,
+            "percentage": percentage,
+            "band": band_for(percentage),
+            "breakdown": breakdown,
+        }
+
+    def score_many(self, records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        questions, max_score = self.questions, self.max_score
+        results = []
+        for record in records:
+            answers = record.get("answers") or {}
+            total = sum(q.score(answers.get(q.id)) for q in questions)
+            percentage = round(total * 100.0 / max_score, 2) if max_score else 0.0
+            results.append({
+                "id": record.get("id"),
+                "score": total,
+                "percentage": percentage,
+                "band": band_for(percentage),
+            })
+        return results
+
+
+def band_for(percentage: float) -> str:
+    for threshold, band in BANDS:
+        if percentage >= threshold:
+            return band
+    return BANDS[-1][1]
@@ -0,0 +1,184 @@
+"""EMI and amortization engine.
+
+Plain loans are computed in closed form with numpy so a batch of thousands of
+(principal, rate, tenure) combinations is a handful of array operations.
+Schedules with prepayments or step-up EMIs are path dependent and are walked
+month by month.
+"""
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+REDUCE_TENURE = "reduce_tenure"
+REDUCE_EMI = "reduce_emi"
+
+
+def _monthly_rate(annual_rate):
+    return np.asarray(annual_rate, dtype=np.float64) / 1200.0
+
+
+def emi_vectorized(principal, annual_rate, tenure_months) -> np.ndarray:
+    """EMI for arrays (or scalars) of principal, annual rate in percent and tenure in months."""
+    principal = np.asarray(principal, dtype=np.float64)
+    tenure = np.asarray(tenure_months, dtype=np.float64)
+    r = _monthly_rate(annual_rate)
+    growth = np.power(1.0 + r, tenure)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        emi = principal * r * growth / (growth - 1.0)
+    # Interest-free loans degrade to straight division
+    return np.where(r == 0, principal / tenure, emi)
+
+
+def batch_summary(principal, annual_rate, tenure_months) -> Dict[str, np.ndarray]:
+    """EMI, total payment and total interest for broadcastable input arrays."""
+    principal, annual_rate, tenure_months = np.broadcast_arrays(
+        np.asarray(principal, dtype=np.float64),
+        np.asarray(annual_rate, dtype=np.float64),
+        np.asarray(tenure_months, dtype=np.float64),
+    )
+    emi = emi_vectorized(principal, annual_rate, tenure_months)
+    total_payment = emi * tenure_months
+    return {
+        "principal": principal,
+        "annual_rate": annual_rate,
+        "tenure_months": tenure_months,
+        "emi": emi,
+        "total_payment": total_payment,
+        "total_interest": total_payment - principal,
+    }
+
+
+def _schedule_rows(month, opening, emi, interest, principal_paid, prepayment, closing) -> List[Dict[str, float]]:
+    columns = zip(
+        month.tolist(),
+        np.round(opening, 2).tolist(),
+        np.round(emi, 2).tolist(),
+        np.round(interest, 2).tolist(),
+        np.round(principal_paid, 2).tolist(),
+        np.round(prepayment, 2).tolist(),
+        np.round(closing, 2).tolist(),
+    )
+    return [
+        {"month": m, "opening_balance": o, "emi": e, "interest": i,
+         "principal": p, "prepayment": pp, "closing_balance": c}
+        for m, o, e, i, p, pp, c in columns
+    ]
+
+
+def plain_schedule_arrays(principal: float, annual_rate: float, tenure_months: int):
+    """Closed-form amortization arrays for a loan without prepayments or step-ups."""
+    r = float(_monthly_rate(annual_rate))
+    emi = float(emi_vectorized(principal, annual_rate, tenure_months))
+    month = np.arange(1, tenure_months + 1)
+    if r == 0:
+        closing = principal - emi * month
+    else:
+        growth = np.power(1.0 + r, month)
+        closing = principal * growth - emi * (growth - 1.0) / r
+    closing = np.maximum(closing, 0.0)
+    closing[-1] = 0.0
+    opening = np.concatenate(([principal], closing[:-1]))
+    interest = opening * r
+    principal_paid = opening - closing
+    emi_column = principal_paid + interest
+    return month, opening, emi_column, interest, principal_paid, np.zeros(tenure_months), closing
+
+
+@lru_cache(maxsize=256)
+def _plain_totals(principal: float, annual_rate: float, tenure_months: int) -> Tuple[float, float]:
+    """Rounded EMI and total interest. Only scalars are cached; a schedule can be 600 rows."""
+    arrays = plain_schedule_arrays(principal, annual_rate, tenure_months)
+    emi = float(emi_vectorized(principal, annual_rate, tenure_months))
+    return round(emi, 2), round(float(arrays[3].sum()), 2)
+
+
+def _plain(principal: float, annual_rate: float, tenure_months: int, include_schedule: bool):
+    emi, total_interest = _plain_totals(principal, annual_rate, tenure_months)
+    result = {
+        "principal": principal,
+        "annual_rate": annual_rate,
+        "tenure_months": tenure_months,
+        "emi": emi,
+        "total_interest": total_interest,
+        "total_payment": round(principal + total_interest, 2),
+        "actual_tenure_months": tenure_months,
+        "interest_saved": 0.0,
+    }
+    if include_schedule:
+        result["schedule"] = _schedule_rows(*plain_schedule_arrays(principal, annual_rate, tenure_months))
+    return result
+
+
+def iter_schedule(principal: float, annual_rate: float, tenure_months: int,
+                  prepayments: Optional[Dict[int, float]] = None, prepayment_mode: str = REDUCE_TENURE,
+                  step_up_percent: float = 0.0) -> Iterator[Tuple[int, float, float, float, float, float, float]]:
+    """Yield (month, opening, emi, interest, principal, prepayment, closing) one month at a time."""
+    prepayments = prepayments or {}
+    r = float(_monthly_rate(annual_rate))
+    emi = float(emi_vectorized(principal, annual_rate, tenure_months))
+    balance = float(principal)
+    month = 0
+    # Reducing EMIs can never stretch past the contracted tenure; reducing tenure
+    # can only end earlier, so the contracted tenure bounds the loop either way.
+    while balance > 0.005 and month < tenure_months:
+        month += 1
+        if step_up_percent and month > 1 and (month - 1) % 12 == 0:
+            emi *= 1.0 + step_up_percent / 100.0
+        opening = balance
+        interest = opening * r
+        if month == tenure_months:
+            emi_paid = opening + interest
+        else:
+            emi_paid = min(emi, opening + interest)
+        principal_paid = emi_paid - interest
+        balance = opening - principal_paid
+        prepayment = min(prepayments.get(month, 0.0), balance)
+        balance -= prepayment
+        if prepayment and prepayment_mode == REDUCE_EMI and balance > 0:
+            emi = float(emi_vectorized(balance, annual_rate, tenure_months - month))
+        yield month, opening, emi_paid, interest, principal_paid, prepayment, balance
+
+
+def _scenario_schedule(principal: float, annual_rate: float, tenure_months: int,
+                       prepayments: Dict[int, float], mode: str, step_up_percent: float):
+    columns = [[] for _ in range(7)]
+    for row in iter_schedule(principal, annual_rate, tenure_months, prepayments, mode, step_up_percent):
+        for column, value in zip(columns, row):
+            column.append(value)
+    return [np.asarray(column) for column in columns]
+
+
+def amortize(principal: float, annual_rate: float, tenure_months: int,
+             prepayments: Optional[Dict[int, float]] = None, prepayment_mode: str = REDUCE_TENURE,
+             step_up_percent: float = 0.0, include_schedule: bool = True) -> Dict:
+    """EMI, totals and (optionally) the month-by-month schedule for one loan scenario.
+
+    ``prepayments`` maps a month number to a lump-sum part payment made after
+    that month's EMI. ``step_up_percent`` raises the EMI once a year.
+    """
+    principal, annual_rate, tenure_months = float(principal), float(annual_rate), int(tenure_months)
+    if not prepayments and not step_up_percent:
+        return _plain(principal, annual_rate, tenure_months, include_schedule)
+
+    baseline = _plain(principal, annual_rate, tenure_months, False)
+    arrays = _scenario_schedule(principal, annual_rate, tenure_months, prepayments or {},
+                                prepayment_mode, step_up_percent)
+    total_interest = float(arrays[3].sum())
+    result = {
+        "principal": principal,
+        "annual_rate": annual_rate,
+        "tenure_months": tenure_months,
+        "emi": baseline["emi"],
+        "total_interest": round(total_interest, 2),
+        "total_payment": round(principal + total_interest, 2),
+        "actual_tenure_months": int(arrays[0][-1]) if len(arrays[0]) else 0,
+        "interest_saved": round(baseline["total_interest"] - total_interest, 2),
+    }
+    if include_schedule:
+        result["schedule"] = _schedule_rows(*arrays)
+    return result
+
+
+def cache_info():
+    return _plain_totals.cache_info()._asdict()
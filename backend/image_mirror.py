@@ -0,0 +1,129 @@
+"""Mirror externally hotlinked content images into the media library.
+
+Finds http(s) image URLs in banners, products, testimonials and articles that
+do not point at our own /uploads, downloads them with bounded parallelism,
+runs them through the same WebP optimization as uploads, registers them in
+media_library (with ``source_url`` so re-runs are no-ops) and rewrites the
+referencing documents to the local URL.
+
+Usage:
+    python image_mirror.py [--concurrency 8]
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+import media_references
+
+MIRROR_MAX_BYTES = int(os.getenv("MIRROR_MAX_BYTES", str(20 * 1024 * 1024)))
+MIRROR_TIMEOUT_SECONDS = float(os.getenv("MIRROR_TIMEOUT_SECONDS", "20"))
+MIRROR_USER = "image-mirror"
+
+
+def is_remote(url: Any) -> bool:
+    return isinstance(url, str) and urlparse(url).scheme in ("http", "https")
+
+
+def mirror_name(url: str) -> str:
+    """Readable, collision-free base name derived from the source URL."""
+    stem = urlparse(url).path.rstrip("/").rsplit("/", 1)[-1].rsplit(".", 1)[0]
+    stem = re.sub(r"[^A-Za-z0-9_-]+", "-", stem).strip("-")[:40] or "image"
+    return f"{stem}_{hashlib.sha1(url.encode()).hexdigest()[:8]}"
+
+
+def download(url: str, max_bytes: int = MIRROR_MAX_BYTES, timeout: float = MIRROR_TIMEOUT_SECONDS) -> bytes:
+    with requests.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        content_type = response.headers.get("content-type", "")
+        if content_type and not content_type.startswith("image/"):
+            raise ValueError(f"Not an image ({content_type})")
+        chunks, size = [], 0
+        for chunk in response.iter_content(64 * 1024):
+            size += len(chunk)
+            if size > max_bytes:
+                raise ValueError(f"Image exceeds {max_bytes} bytes")
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def collect_external_urls(db) -> List[str]:
+    urls = set()
+    for section, fields in media_references.REFERENCE_FIELDS.items():
+        async for doc in db[section].find({}, {field: 1 for field in fields}):
+            urls.update(doc[field] for field in fields if is_remote(doc.get(field)))
+    # Absolute URLs naming a media_library file are our own uploads (the media library
+    # copies them with the backend origin); only the rest, e.g. other CDNs, are hotlinks
+    names = {media_references.media_file_name(url) for url in urls} - {None}
+    local = set(await db.media_library.distinct("file_name", {"file_name": {"$in": list(names)}})) if names else set()
+    return sorted(url for url in urls if media_references.media_file_name(url) not in local)
+
+
+async def rewrite_references(db, source_url: str, local_url: str) -> int:
+    rewritten = 0
+    now = datetime.now(timezone.utc).isoformat()
+    for section, fields in media_references.REFERENCE_FIELDS.items():
+        projection = {field: 1 for field in fields}
+        for field in fields:
+            async for doc in db[section].find({field: source_url}, {"_id": 1}):
+                await db[section].update_one({"_id": doc["_id"]}, {"$set": {field: local_url, "updated_at": now}})
+                updated = await db[section].find_one({"_id": doc["_id"]}, projection)
+                await media_references.sync_record(db, section, str(doc["_id"]), updated)
+                rewritten += 1
+    return rewritten
+
+
+async def mirror_external_images(
+    db,
+    save_image: Callable[..., Awaitable[Dict[str, Any]]],
+    concurrency: int = 8,
+    fetch: Callable[[str], bytes] = download,
+    audit: Optional[Callable[..., Awaitable[None]]] = None,
+) -> Dict[str, Any]:
+    """Mirror every external content image; returns per-URL results."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def mirror_one(url: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                media = await db.media_library.find_one({"source_url": url})
+                if media is None:
+                    contents = await asyncio.to_thread(fetch, url)
+                    media = await save_image(contents, mirror_name(url), MIRROR_USER, {"source_url": url})
+                rewritten = await rewrite_references(db, url, media["url"])
+            except Exception as e:
+                return {"source_url": url, "status": "error", "error": getattr(e, "detail", None) or str(e)}
+        if audit:
+            await audit(MIRROR_USER, "media", "mirror", str(media["_id"]), new_value={"source_url": url, "url": media["url"]})
+        return {"source_url": url, "status": "mirrored", "url": media["url"], "documents": rewritten}
+
+    results = await asyncio.gather(*(mirror_one(url) for url in await collect_external_urls(db)))
+    return {
+        "mirrored": sum(1 for r in results if r["status"] == "mirrored"),
+        "failed": sum(1 for r in results if r["status"] == "error"),
+        "results": results,
+    }
+
+
+async def main(concurrency: int):
+    import server
+
+    summary = await mirror_external_images(server.db, server.save_optimized_image, concurrency, audit=server.log_audit)
+    for result in summary["results"]:
+        if result["status"] == "mirrored":
+            print(f"✅ {result['source_url']} -> {result['url']} ({result['documents']} documents)")
+        else:
+            print(f"❌ {result['source_url']}: {result['error']}")
+    print(f"Mirrored {summary['mirrored']} images, {summary['failed']} failed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mirror external content images into the media library")
+    parser.add_argument("--concurrency", type=int, default=8)
+    asyncio.run(main(parser.parse_args().concurrency))
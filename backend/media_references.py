@@ -0,0 +1,99 @@
+"""Reference index from content image fields to media_library files.
+
+Each ``media_references`` document records that one field of one content
+record points at an uploaded file. Content mutation handlers call
+``sync_record`` so the index is maintained incrementally, and
+``media_library.unreferenced_since`` is kept in step so the orphan sweeper
+only needs an indexed range query.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+# Content collections and the fields that may hold an uploaded image URL
+REFERENCE_FIELDS = {
+    "banners": ["image_url"],
+    "products": ["image_url"],
+    "testimonials": ["image_url"],
+    "articles": ["thumbnail_url"],
+}
+
+# Records from synthetic_data.py are never flagged, so the orphan sweeper leaves them to --purge
+NOT_SYNTHETIC = {"synthetic": {"$ne": True}}
+
+
+
+def media_file_name(url: Optional[str]) -> Optional[str]:
+    """File name for URLs served from /uploads (absolute or relative), else None.
+
+    The host is deliberately not checked: the media library copies absolute
+    ``<backend URL>/uploads/<name>`` URLs, and missing one of those would let the
+    sweeper delete a live file. A foreign /uploads/ URL can at worst keep a
+    same-named library file alive.
+    """
+    if not url or not isinstance(url, str):
+        return None
+    path = urlparse(url).path
+    if "/uploads/" not in path:
+        return None
+    file_name = path.rsplit("/", 1)[-1]
+    return file_name or None
+
+
+def references_for(section: str, record_id: str, doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+    references = []
+    for field in REFERENCE_FIELDS.get(section, []):
+        file_name = media_file_name(doc.get(field))
+        if file_name:
+            references.append({"file_name": file_name, "section": section, "record_id": record_id, "field": field})
+    return references
+
+
+async def refresh_unreferenced(db, file_names: Set[str]):
+    now = datetime.now(timezone.utc).isoformat()
+    for file_name in file_names:
+        if await db.media_references.count_documents({"file_name": file_name}, limit=1):
+            await db.media_library.update_many({"file_name": file_name}, {"$set": {"unreferenced_since": None}})
+        else:
+            await db.media_library.update_many(
+                {"file_name": file_name, "unreferenced_since": None, **NOT_SYNTHETIC},
+                {"$set": {"unreferenced_since": now}},
+            )
+
+
+async def sync_record(db, section: str, record_id: str, doc: Optional[Dict[str, Any]] = None):
+    """Replace the references held by one content record; pass doc=None when it is deleted."""
+    if section not in REFERENCE_FIELDS:
+        return
+    old = await db.media_references.find({"section": section, "record_id": record_id}).to_list(None)
+    new = references_for(section, record_id, doc) if doc else []
+    await db.media_references.delete_many({"section": section, "record_id": record_id})
+    if new:
+        await db.media_references.insert_many(new)
+    await refresh_unreferenced(db, {ref["file_name"] for ref in old} | {ref["file_name"] for ref in new})
+
+
+async def usages(db, file_name: str) -> List[Dict[str, Any]]:
+    return await db.media_references.find({"file_name": file_name}, {"_id": 0}).to_list(100)
+
+
+async def rebuild(db) -> int:
+    """Regenerate the whole index from content collections."""
+    await db.media_references.delete_many({})
+    count = 0
+    for section, fields in REFERENCE_FIELDS.items():
+        projection = {field: 1 for field in fields}
+        async for doc in db[section].find({}, projection):
+            references = references_for(section, str(doc["_id"]), doc)
+            if references:
+                await db.media_references.insert_many(references)
+                count += len(references)
+    referenced = set(await db.media_references.distinct("file_name"))
+    now = datetime.now(timezone.utc).isoformat()
+    await db.media_library.update_many({"file_name": {"$in": list(referenced)}}, {"$set": {"unreferenced_since": None}})
+    await db.media_library.update_many(
+        {"file_name": {"$nin": list(referenced)}, "unreferenced_since": None, **NOT_SYNTHETIC},
+        {"$set": {"unreferenced_since": now}},
+    )
+    return count
+
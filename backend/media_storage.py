@@ -0,0 +1,141 @@
+"""Storage backends for uploaded media.
+
+Media documents keep their ``/uploads/<key>`` URLs whichever backend is in
+use; only where the bytes live changes.
+
+* ``LocalStorage`` writes under a directory that the app serves with
+  StaticFiles (the single-node default).
+* ``S3Storage`` writes to an S3-compatible bucket (AWS S3, MinIO, ...) using
+  boto3's managed transfer, which switches to multipart uploads for large
+  objects. ``/uploads/<key>`` then answers with a redirect to a presigned URL
+  (or to ``public_url`` when the bucket sits behind a CDN), so API nodes share
+  no disk and never proxy image bytes.
+
+Writes accept any readable file object and are streamed to the backend.
+"""
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Iterable, Optional
+
+# Object names are unique per upload, so stored media can be cached indefinitely
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class LocalStorage:
+    serves_locally = True
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path(self, key: str) -> Path:
+        target = (self.root / key).resolve()
+        if not target.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Media key '{key}' is outside the upload directory")
+        return target
+
+    def prepare(self):
+        (self.root / "thumbs").mkdir(parents=True, exist_ok=True)
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    def put(self, key: str, fileobj: BinaryIO, content_type: str):
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file and rename, so readers never see a partial image
+        fd, temp_path = tempfile.mkstemp(dir=target.parent, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                shutil.copyfileobj(fileobj, out, 1024 * 1024)
+            os.replace(temp_path, target)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+    def delete(self, keys: Iterable[str]):
+        for key in keys:
+            self.path(key).unlink(missing_ok=True)
+
+    def read_url(self, key: str) -> Optional[str]:
+        return None  # served by the StaticFiles mount
+
+
+class S3Storage:
+    serves_locally = False
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None,
+                 region: Optional[str] = None, public_url: Optional[str] = None,
+                 presign_seconds: int = 3600, multipart_threshold: int = 8 * 1024 * 1024):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.public_url = public_url.rstrip("/") if public_url else None
+        self.presign_seconds = presign_seconds
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            # Path-style addressing works with MinIO and other S3-compatible servers
+            config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+        )
+        self.transfer_config = TransferConfig(multipart_threshold=multipart_threshold,
+                                              multipart_chunksize=multipart_threshold)
+
+    def object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def prepare(self):
+        self.client.head_bucket(Bucket=self.bucket)
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def put(self, key: str, fileobj: BinaryIO, content_type: str):
+        self.client.upload_fileobj(
+            fileobj, self.bucket, self.object_key(key),
+            ExtraArgs={"ContentType": content_type, "CacheControl": IMMUTABLE_CACHE_CONTROL},
+            Config=self.transfer_config,
+        )
+
+    def delete(self, keys: Iterable[str]):
+        objects = [{"Key": self.object_key(key)} for key in keys]
+        if objects:
+            self.client.delete_objects(Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True})
+
+    def read_url(self, key: str) -> str:
+        if self.public_url:
+            return f"{self.public_url}/{self.object_key(key)}"
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self.object_key(key)},
+            ExpiresIn=self.presign_seconds,
+        )
+
+
+def from_env(upload_dir: Path):
+    backend = os.getenv("MEDIA_STORAGE", "local").lower()
+    if backend == "local":
+        return LocalStorage(upload_dir)
+    if backend == "s3":
+        return S3Storage(
+            bucket=os.environ["S3_BUCKET"],
+            prefix=os.getenv("S3_KEY_PREFIX", "uploads/"),
+            endpoint_url=os.getenv("S3_ENDPOINT_URL") or None,
+            region=os.getenv("S3_REGION") or None,
+            public_url=os.getenv("S3_PUBLIC_URL") or None,
+            presign_seconds=int(os.getenv("S3_PRESIGN_SECONDS", "3600")),
+        )
+    raise ValueError(f"Unknown MEDIA_STORAGE '{backend}' (expected local or s3)")
@@ -0,0 +1,293 @@
+"""Per-request phase timing, on-demand profiling and the slow-operation log.
+
+Every HTTP request runs with a ``RequestTrace`` in a context variable. Motor
+copies the context into its executor threads, so the pymongo command listener
+can charge each command's duration to the request that issued it; other hot
+spots (bcrypt, Pillow, JSON serialization) are wrapped in ``phase(name)``.
+
+Requests slower than ``request_threshold_ms`` and Mongo commands slower than
+``command_threshold_ms`` are queued on a ``SlowOperationLog`` together with the
+route template and the command's query shape (values replaced by "?"), and a
+background task flushes them to the ``slow_operations`` collection.
+
+An admin can send ``X-Profile: 1`` to have a (sampled) request run under
+cProfile; the response carries a ``Server-Timing`` phase breakdown and an
+``X-Profile-Id`` naming the stored profile. cProfile only sees the event loop
+thread, so the call profile also includes other requests served concurrently.
+"""
+import asyncio
+import cProfile
+import pstats
+import random
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
+
+from pymongo import IndexModel, monitoring
+
+LOG_COLLECTION = "slow_operations"
+SHAPE_FIELDS = ("filter", "sort", "projection", "pipeline", "query", "updates", "deletes", "q", "u")
+MAX_SHAPE_ITEMS = 20
+PROFILE_ROWS = 40
+
+INDEXES = [
+    IndexModel([("timestamp", -1)]),
+    IndexModel([("kind", 1), ("timestamp", -1)]),
+    IndexModel([("profile_id", 1)], sparse=True),
+    IndexModel([("expires_at", 1)], expireAfterSeconds=0),
+]
+
+current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("current_trace", default=None)
+
+
+def query_shape(value: Any) -> Any:
+    """Structure of a filter/pipeline with every literal replaced by '?'."""
+    if isinstance(value, Mapping):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) and value and all(isinstance(item, Mapping) for item in value):
+        return [query_shape(item) for item in value[:MAX_SHAPE_ITEMS]]
+    return "?"
+
+
+def command_shape(command: Mapping) -> Dict[str, Any]:
+    return {field: query_shape(command[field]) for field in SHAPE_FIELDS if field in command}
+
+
+def route_template(scope) -> str:
+    """Route path (e.g. /api/admin/banners/{banner_id}) once the router has matched the request."""
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is not None and app is not None:
+        for route in app.routes:
+            if getattr(route, "endpoint", None) is endpoint or getattr(route, "app", None) is endpoint:
+                return route.path
+    return scope.get("path", "")
+
+
+class RequestTrace:
+    def __init__(self, scope):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.mongo_commands = 0
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @property
+    def route(self) -> str:
+        return f"{self.scope.get('method', '')} {route_template(self.scope)}"
+
+    def breakdown(self, total: float) -> Dict[str, float]:
+        phases = {name: round(seconds * 1000, 2) for name, seconds in self.phases.items()}
+        phases["other"] = round(max(total - sum(self.phases.values()), 0.0) * 1000, 2)
+        return phases
+
+
+@contextmanager
+def phase(name: str):
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - started)
+
+
+class SlowOperationLog:
+    """Thread-safe buffer of slow operations, flushed to Mongo in batches."""
+
+    def __init__(self, request_threshold_ms: float, command_threshold_ms: float,
+                 retention_days: float, max_pending: int = 1000):
+        self.request_threshold_ms = request_threshold_ms
+        self.command_threshold_ms = command_threshold_ms
+        self.retention = timedelta(days=retention_days)
+        self._pending: deque = deque()
+        self.max_pending = max_pending
+        self.stats = {"requests": 0, "commands": 0, "profiles": 0, "dropped": 0, "flushed": 0}
+
+    def record(self, kind: str, entry: Dict[str, Any]):
+        if len(self._pending) >= self.max_pending:
+            self.stats["dropped"] += 1
+            return
+        now = datetime.now(timezone.utc)
+        self.stats[f"{kind}s"] += 1
+        self._pending.append({"kind": kind, **entry, "timestamp": now.isoformat(), "expires_at": now + self.retention})
+
+    async def flush(self, db) -> int:
+        batch = []
+        while self._pending:
+            batch.append(self._pending.popleft())
+        if batch:
+            await db[LOG_COLLECTION].insert_many(batch, ordered=False)
+            self.stats["flushed"] += len(batch)
+        return len(batch)
+
+    async def run(self, db, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush(db)
+            except Exception as e:
+                print(f"❌ Slow-operation log flush failed: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pending": len(self._pending),
+            "request_threshold_ms": self.request_threshold_ms,
+            "command_threshold_ms": self.command_threshold_ms,
+        }
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Charges Mongo time to the current request and logs slow commands."""
+
+    def __init__(self, slow_log: SlowOperationLog):
+        self.slow_log = slow_log
+        self._started: Dict[Any, Any] = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = event.command.get("collection")  # getMore names its collection separately
+        if collection == LOG_COLLECTION:
+            return
+        # Keep a reference only; the shape is computed for slow commands alone
+        self._started[(event.connection_id, event.request_id)] = (collection, event.command)
+
+    def succeeded(self, event):
+        self._finish(event, None)
+
+    def failed(self, event):
+        self._finish(event, str(event.failure.get("errmsg", "failed")))
+
+    def _finish(self, event, error: Optional[str]):
+        started = self._started.pop((event.connection_id, event.request_id), None)
+        if started is None:
+            return
+        seconds = event.duration_micros / 1_000_000
+        trace = current_trace.get()
+        if trace is not None:
+            trace.add("mongo", seconds)
+            trace.mongo_commands += 1
+        duration_ms = seconds * 1000
+        if duration_ms >= self.slow_log.command_threshold_ms:
+            collection, command = started
+            self.slow_log.record("command", {
+                "route": trace.route if trace else None,
+                "command": event.command_name,
+                "database": event.database_name,
+                "collection": collection,
+                "shape": command_shape(command),
+                "duration_ms": round(duration_ms, 2),
+                "error": error,
+            })
+
+
+def profile_rows(profiler: cProfile.Profile, limit: int = PROFILE_ROWS) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": f"{file.rsplit('site-packages/', 1)[-1]}:{line}({name})",
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        }
+        for (file, line, name), (_, calls, total, cumulative, _) in rows
+    ]
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, slow_log: SlowOperationLog, authorize: Callable[[str], Awaitable[bool]],
+                 sample_rate: float = 1.0):
+        self.app = app
+        self.slow_log = slow_log
+        self.authorize = authorize
+        self.sample_rate = sample_rate
+        self._profiling = False  # cProfile cannot run two profilers at once
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trace = RequestTrace(scope)
+        token = current_trace.set(trace)
+        try:
+            profiler = await self._profiler_for(scope)
+            if profiler is None:
+                await self._run(scope, receive, send, trace, None)
+                return
+            try:
+                await self._run(scope, receive, send, trace, profiler)
+            finally:
+                self._profiling = False
+        finally:
+            current_trace.reset(token)
+
+    async def _profiler_for(self, scope) -> Optional[cProfile.Profile]:
+        """A profiler for this request, with the profiling slot claimed; None otherwise."""
+        headers = dict(scope.get("headers") or [])
+        if headers.get(b"x-profile", b"").lower() not in (b"1", b"true", b"yes"):
+            return None
+        if self._profiling or random.random() >= self.sample_rate:
+            return None
+        # Claim the slot before awaiting, so concurrent requests can't pass the check too
+        self._profiling = True
+        try:
+            authorization = headers.get(b"authorization", b"").decode("latin-1")
+            authorized = authorization.lower().startswith("bearer ") and await self.authorize(authorization[7:])
+        except BaseException:
+            self._profiling = False
+            raise
+        if not authorized:
+            self._profiling = False
+            return None
+        return cProfile.Profile()
+
+    async def _run(self, scope, receive, send, trace: RequestTrace, profiler: Optional[cProfile.Profile]):
+        profile_id = uuid.uuid4().hex if profiler else None
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if profiler:
+                    elapsed = time.perf_counter() - trace.started
+                    timing = ", ".join(f"{name};dur={ms}" for name, ms in trace.breakdown(elapsed).items())
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timing.encode("latin-1")))
+                    headers.append((b"x-profile-id", profile_id.encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        if profiler:
+            profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profiler:
+                profiler.disable()
+            elapsed = time.perf_counter() - trace.started
+            duration_ms = round(elapsed * 1000, 2)
+            entry = {
+                "route": trace.route,
+                "path": scope.get("path"),
+                "status": status_code,
+                "duration_ms": duration_ms,
+                "phases": trace.breakdown(elapsed),
+                "mongo_commands": trace.mongo_commands,
+            }
+            if profiler:
+                self.slow_log.record("profile", {"profile_id": profile_id, **entry, "profile": profile_rows(profiler)})
+            elif duration_ms >= self.slow_log.request_threshold_ms:
+                self.slow_log.record("request", entry)
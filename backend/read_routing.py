@@ -0,0 +1,102 @@
+"""Read-preference routing and per-server load accounting.
+
+Public content loaders read through a database handle whose read preference
+comes from ``PUBLIC_READ_PREFERENCE`` (e.g. ``secondaryPreferred``) bounded by
+``maxStalenessSeconds``. Admin reads, reads-after-write and auth lookups keep
+using the primary handle. ``ServerLoadCounter`` is a command listener that
+counts commands per replica set member so the split is visible in metrics.
+
+Usage (against a replica set, see CMS_ADMIN_GUIDE.md):
+    python read_routing.py --reads 500    # run public reads and print the per-member split
+"""
+import argparse
+import asyncio
+from collections import Counter, defaultdict
+from typing import Any, Dict
+
+from pymongo import monitoring
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+
+READ_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+# The server rejects smaller values: heartbeat interval plus idle write period
+MIN_MAX_STALENESS_SECONDS = 90
+READ_COMMANDS = {"find", "getMore", "aggregate", "count", "distinct"}
+WRITE_COMMANDS = {"insert", "update", "delete", "findAndModify"}
+
+
+def read_preference(mode: str, max_staleness_seconds: int = -1):
+    if mode not in READ_MODES:
+        raise ValueError(f"Unknown read preference '{mode}' (expected one of {', '.join(READ_MODES)})")
+    if mode == "primary":
+        return Primary()
+    if max_staleness_seconds != -1 and max_staleness_seconds < MIN_MAX_STALENESS_SECONDS:
+        raise ValueError(f"maxStalenessSeconds must be -1 or at least {MIN_MAX_STALENESS_SECONDS}")
+    return READ_MODES[mode](max_staleness=max_staleness_seconds)
+
+
+class ServerLoadCounter(monitoring.CommandListener):
+    def __init__(self):
+        self._counts: Dict[Any, Counter] = defaultdict(Counter)
+
+    def started(self, event):
+        if event.command_name in READ_COMMANDS:
+            kind = "reads"
+        elif event.command_name in WRITE_COMMANDS:
+            kind = "writes"
+        else:
+            kind = "other"
+        self._counts[event.connection_id][kind] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def snapshot(self, topology_description) -> Dict[str, Any]:
+        # Roles come from the driver's current view of the topology (RSPrimary, RSSecondary, ...)
+        roles = {address: server.server_type_name
+                 for address, server in topology_description.server_descriptions().items()}
+        servers = []
+        reads_by_role: Counter = Counter()
+        for address, counts in sorted(self._counts.items(), key=lambda item: str(item[0])):
+            role = roles.get(address, "Unknown")
+            reads_by_role[role] += counts["reads"]
+            servers.append({"address": f"{address[0]}:{address[1]}", "role": role, **{
+                kind: counts[kind] for kind in ("reads", "writes", "other")}})
+        total_reads = sum(reads_by_role.values())
+        return {
+            "topology": topology_description.topology_type_name,
+            "servers": servers,
+            "reads_by_role": dict(reads_by_role),
+            "secondary_read_ratio": round(reads_by_role["RSSecondary"] / total_reads, 4) if total_reads else 0.0,
+        }
+
+
+async def main(reads: int):
+    import server
+
+    # Bypass the public read cache so every read reaches Mongo
+    loaders = [server.load_public_banners, server.load_public_products, server.load_public_articles]
+    await server.public_db.command("ping")
+    for i in range(reads):
+        await loaders[i % len(loaders)](None)
+    snapshot = server.server_load.snapshot(server.client.delegate.topology_description)
+    print(f"Public read preference: {server.PUBLIC_READ_PREFERENCE} "
+          f"(maxStalenessSeconds={server.PUBLIC_READ_MAX_STALENESS_SECONDS}), topology {snapshot['topology']}")
+    for entry in snapshot["servers"]:
+        print(f"  {entry['address']:<24} {entry['role']:<12} reads={entry['reads']} writes={entry['writes']}")
+    ratio = snapshot["secondary_read_ratio"]
+    print(("✅" if ratio > 0 else "❌") + f" {ratio:.0%} of reads served by secondaries")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check where public reads are routed")
+    parser.add_argument("--reads", type=int, default=300)
+    asyncio.run(main(parser.parse_args().reads))
@@ -0,0 +1,167 @@
+"""Streaming amortization reports.
+
+Reports are produced as iterators of byte chunks so a response never holds
+more than one batch of rows in memory, regardless of tenure or the number of
+scenarios. CSV can additionally be gzip-compressed on the fly; XLSX is a zip
+container written through an unseekable sink, so it streams the same way.
+"""
+import csv
+import io
+import zipfile
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List
+from xml.sax.saxutils import escape
+
+import emi_engine
+
+ROWS_PER_CHUNK = 500
+SCHEDULE_HEADER = ["scenario", "month", "opening_balance", "emi", "interest",
+                   "principal", "prepayment", "closing_balance"]
+
+
+def _scenario_rows(scenarios: List[Dict[str, Any]]) -> Iterator[list]:
+    for scenario in scenarios:
+        rows = emi_engine.iter_schedule(
+            scenario["principal"],
+            scenario["annual_rate"],
+            scenario["tenure_months"],
+            prepayments=scenario.get("prepayments"),
+            prepayment_mode=scenario.get("prepayment_mode", emi_engine.REDUCE_TENURE),
+            step_up_percent=scenario.get("step_up_percent", 0.0),
+        )
+        for month, *amounts in rows:
+            yield [scenario["label"], month, *(round(amount, 2) for amount in amounts)]
+
+
+def iter_csv_report(scenarios: List[Dict[str, Any]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(SCHEDULE_HEADER)
+    pending = 0
+    for row in _scenario_rows(scenarios):
+        writer.writerow(row)
+        pending += 1
+        if pending >= ROWS_PER_CHUNK:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode("utf-8")
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet2.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Summary" sheetId="1" r:id="rId1"/><sheet name="Schedule" sheetId="2" r:id="rId2"/></sheets>'
+    '</workbook>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet2.xml"/>'
+    '</Relationships>'
+)
+SHEET_OPEN = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+              '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+SHEET_CLOSE = '</sheetData></worksheet>'
+
+
+def _xlsx_row(values: list) -> str:
+    cells = []
+    for value in values:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f"<c><v>{value}</v></c>")
+        else:
+            cells.append(f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>')
+    return f"<row>{''.join(cells)}</row>"
+
+
+def iter_xlsx_report(scenarios: List[Dict[str, Any]]) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", XLSX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", XLSX_ROOT_RELS)
+        archive.writestr("xl/workbook.xml", XLSX_WORKBOOK)
+        archive.writestr("xl/_rels/workbook.xml.rels", XLSX_WORKBOOK_RELS)
+
+        summary_header = ["scenario", "principal", "annual_rate", "tenure_months", "emi",
+                          "total_interest", "total_payment", "actual_tenure_months", "interest_saved"]
+        summary_rows = [summary_header]
+        for scenario in scenarios:
+            totals = emi_engine.amortize(
+                scenario["principal"], scenario["annual_rate"], scenario["tenure_months"],
+                prepayments=scenario.get("prepayments"),
+                prepayment_mode=scenario.get("prepayment_mode", emi_engine.REDUCE_TENURE),
+                step_up_percent=scenario.get("step_up_percent", 0.0),
+                include_schedule=False,
+            )
+            summary_rows.append([scenario["label"]] + [totals[key] for key in summary_header[1:]])
+        archive.writestr("xl/worksheets/sheet1.xml", SHEET_OPEN + "".join(map(_xlsx_row, summary_rows)) + SHEET_CLOSE)
+        yield sink.drain()
+
+        with archive.open("xl/worksheets/sheet2.xml", "w", force_zip64=True) as sheet:
+            sheet.write((SHEET_OPEN + _xlsx_row(SCHEDULE_HEADER)).encode("utf-8"))
+            batch = []
+            for row in _scenario_rows(scenarios):
+                batch.append(_xlsx_row(row))
+                if len(batch) >= ROWS_PER_CHUNK:
+                    sheet.write("".join(batch).encode("utf-8"))
+                    batch.clear()
+                    data = sink.drain()
+                    if data:
+                        yield data
+            sheet.write(("".join(batch) + SHEET_CLOSE).encode("utf-8"))
+    yield sink.drain()
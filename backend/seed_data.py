@@ -1,13 +1,123 @@
+"""Seed the CMS with the content that used to be hard-coded in the frontend.
+
+By default seeding is diff-based and safe to re-run: every seeded record is
+matched by a stable key, and ``seed_state`` remembers which document it became
+and a hash of the content it was seeded with. Only records whose seed content
+changed are rewritten, and records edited (or deleted) in the admin panel since
+they were seeded are left alone unless ``--force`` is given.
+
+Usage:
+    python seed_data.py              # diff-based upsert
+    python seed_data.py --force      # also overwrite records edited in the admin panel
+    python seed_data.py --replace    # wipe each collection and reinsert (old behaviour)
+"""
+import argparse
 import asyncio
+import hashlib
+import json
 import os
 from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timezone
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
 
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
 client = AsyncIOMotorClient(MONGO_URL)
 db = client.aham_cms
 
-async def seed_banners():
+# Stable key identifying each seeded record within its collection
+SEED_KEYS = {
+    "banners": "cta_action",
+    "products": "title_en",
+    "testimonials": "name",
+    "articles": "slug",
+}
+# Fields that differ on every run and so never count as a content change
+VOLATILE_FIELDS = {"_id", "created_at", "updated_at", "published_date"}
+BULK_BATCH_SIZE = 500
+
+def content_hash(doc):
+    content = {k: v for k, v in doc.items() if k not in VOLATILE_FIELDS}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, ensure_ascii=False, default=str).encode()).hexdigest()
+
+async def bulk_write_batched(collection, operations):
+    for start in range(0, len(operations), BULK_BATCH_SIZE):
+        await collection.bulk_write(operations[start:start + BULK_BATCH_SIZE], ordered=False)
+
+async def apply_seed(collection, docs, replace=False, force=False):
+    """Bring one collection in line with its seed list; returns per-outcome counts."""
+    key_field = SEED_KEYS[collection]
+    now = datetime.now(timezone.utc).isoformat()
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "kept": 0}
+
+    if replace:
+        await db[collection].delete_many({})
+        await db.seed_state.delete_many({"collection": collection})
+        docs = [{**doc, "_id": ObjectId()} for doc in docs]
+        await db[collection].insert_many(docs)
+        await bulk_write_batched(db.seed_state, [
+            InsertOne({"collection": collection, "key": doc[key_field], "doc_id": doc["_id"],
+                       "hash": content_hash(doc), "seeded_at": now})
+            for doc in docs
+        ])
+        counts["inserted"] = len(docs)
+        return counts
+
+    keys = [doc[key_field] for doc in docs]
+    state = {entry["key"]: entry async for entry in db.seed_state.find({"collection": collection, "key": {"$in": keys}})}
+    tracked = {doc["_id"]: doc async for doc in db[collection].find({"_id": {"$in": [e["doc_id"] for e in state.values()]}})}
+    # Records seeded before seed_state existed are adopted by their natural key
+    untracked = [key for key in keys if key not in state]
+    adoptable = {doc[key_field]: doc async for doc in db[collection].find({key_field: {"$in": untracked}})}
+
+    operations, state_operations = [], []
+    for doc in docs:
+        key = doc[key_field]
+        new_hash = content_hash(doc)
+        entry = state.get(key)
+        existing = tracked.get(entry["doc_id"]) if entry else adoptable.get(key)
+
+        if existing is None:
+            if entry and not force:
+                # Seeded earlier, since deleted in the admin panel
+                counts["kept"] += 1
+                continue
+            doc_id = ObjectId()
+            operations.append(InsertOne({**doc, "_id": doc_id}))
+            counts["inserted"] += 1
+        else:
+            doc_id = existing["_id"]
+            current_hash = content_hash(existing)
+            if current_hash == new_hash:
+                counts["unchanged"] += 1
+                if entry and entry["hash"] == new_hash and entry["doc_id"] == doc_id:
+                    continue
+            elif current_hash != (entry or {}).get("hash") and not force:
+                # Edited in the admin panel since it was seeded (or never seeded by us)
+                counts["kept"] += 1
+                continue
+            else:
+                update = {"$set": {k: v for k, v in doc.items() if k not in ("created_at", "published_date")}}
+                removed = [k for k in existing if k not in doc and k not in VOLATILE_FIELDS]
+                if removed:
+                    update["$unset"] = {k: "" for k in removed}
+                operations.append(UpdateOne({"_id": doc_id}, update))
+                counts["updated"] += 1
+        state_operations.append(UpdateOne(
+            {"collection": collection, "key": key},
+            {"$set": {"doc_id": doc_id, "hash": new_hash, "seeded_at": now}},
+            upsert=True,
+        ))
+
+    await bulk_write_batched(db[collection], operations)
+    await bulk_write_batched(db.seed_state, state_operations)
+    return counts
+
+def report(collection, counts):
+    print(f"✅ Seeded {collection}: {counts['inserted']} inserted, {counts['updated']} updated, "
+          f"{counts['unchanged']} unchanged, {counts['kept']} kept (edited in admin)")
+
+async def seed_banners(replace=False, force=False):
     """Seed hero banners from existing frontend data"""
     banners = [
         {
@@ -72,11 +182,9 @@ async def seed_banners():
         }
     ]
     
-    await db.banners.delete_many({})
-    await db.banners.insert_many(banners)
-    print(f"✅ Seeded {len(banners)} banners")
+    report("banners", await apply_seed("banners", banners, replace, force))
 
-async def seed_products():
+async def seed_products(replace=False, force=False):
     """Seed loan products from existing frontend data"""
     products = [
         {
@@ -165,11 +273,9 @@ async def seed_products():
         }
     ]
     
-    await db.products.delete_many({})
-    await db.products.insert_many(products)
-    print(f"✅ Seeded {len(products)} products")
+    report("products", await apply_seed("products", products, replace, force))
 
-async def seed_testimonials():
+async def seed_testimonials(replace=False, force=False):
     """Seed testimonials from existing frontend data"""
     testimonials = [
         {
@@ -239,11 +345,9 @@ async def seed_testimonials():
         }
     ]
     
-    await db.testimonials.delete_many({})
-    await db.testimonials.insert_many(testimonials)
-    print(f"✅ Seeded {len(testimonials)} testimonials")
+    report("testimonials", await apply_seed("testimonials", testimonials, replace, force))
 
-async def seed_articles():
+async def seed_articles(replace=False, force=False):
     """Seed articles from existing frontend data"""
     articles = [
         {
@@ -284,22 +388,25 @@ async def seed_articles():
         }
     ]
     
-    await db.articles.delete_many({})
-    await db.articles.insert_many(articles)
-    print(f"✅ Seeded {len(articles)} articles")
+    report("articles", await apply_seed("articles", articles, replace, force))
 
-async def main():
+async def main(replace=False, force=False):
     print("🌱 Starting data migration from frontend to CMS...")
     print("=" * 60)
     
-    await seed_banners()
-    await seed_products()
-    await seed_testimonials()
-    await seed_articles()
+    await db.seed_state.create_index([("collection", 1), ("key", 1)], unique=True)
+    await seed_banners(replace, force)
+    await seed_products(replace, force)
+    await seed_testimonials(replace, force)
+    await seed_articles(replace, force)
     
     print("=" * 60)
     print("✅ All existing frontend data migrated to CMS successfully!")
     print("🎉 You can now edit this content through the Admin Panel at /admin")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Seed CMS content")
+    parser.add_argument("--replace", action="store_true", help="wipe each collection and reinsert")
+    parser.add_argument("--force", action="store_true", help="overwrite records edited in the admin panel")
+    args = parser.parse_args()
+    asyncio.run(main(args.replace, args.force))
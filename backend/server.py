@@ -1,11 +1,12 @@
-from fastapi import FastAPI, HTTPException, Depends, status, File, UploadFile
+from fastapi import FastAPI, HTTPException, Depends, status, File, UploadFile, Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta, timezone
+from typing import Annotated, List, Optional, Dict, Any, Union
+from datetime import date, datetime, time as dt_time, timedelta, timezone
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 import os
@@ -14,9 +15,64 @@ from PIL import Image
 import io
 import shutil
 from pathlib import Path
+import time
+import re
+import json
+import base64
+import emi_engine
+import reports
+from eligibility_engine import EligibilityScorer
+from coalescing import SingleFlightCache
+import audit_rollups
+from pymongo import IndexModel
+from compression import CompressionMiddleware, choose_encoding
+import media_references
+import image_mirror
+import media_storage
+import profiling
+import admission
+import read_routing
+import anyio
+import asyncio
+import contextvars
+import functools
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 app = FastAPI(title="AHAM Housing Finance CMS API")
 
+# Admission Control: expensive route classes get bounded concurrency and wait queues
+# (ADMISSION_<CLASS>_CONCURRENCY / _QUEUE / _TIMEOUT_SECONDS); public content reads are never queued
+ADMISSION_MAX_LOOP_LAG_MS = float(os.getenv("ADMISSION_MAX_LOOP_LAG_MS", "250"))
+admission_control = admission.AdmissionController([
+    admission.RouteClass.from_env("auth", [
+        ("POST", "/api/admin/login"),
+        ("POST", "/api/admin/users"),
+    ], concurrency=4, queue_size=16, queue_timeout=3),
+    admission.RouteClass.from_env("upload", [
+        ("POST", "/api/admin/media/upload"),  # also matches upload-batch
+        ("POST", "/api/admin/media/mirror-external"),
+    ], concurrency=2, queue_size=8, queue_timeout=10),
+    admission.RouteClass.from_env("reports", [
+        ("GET", "/api/admin/audit-logs"),
+        ("*", "/api/admin/analytics/"),
+        ("GET", "/api/admin/slow-operations"),
+        ("POST", "/api/admin/eligibility/score-batch"),
+        ("POST", "/api/admin/media/gc"),
+        ("POST", "/api/admin/media/references/rebuild"),
+    ], concurrency=4, queue_size=16, queue_timeout=5),
+    # Anonymous downloads hold a slot for the whole stream, so they get their own pool
+    # and can never lock admins out of the dashboards above
+    admission.RouteClass.from_env("public_reports", [
+        ("*", "/api/cms/emi-calculator/report"),
+        ("POST", "/api/cms/emi-calculator/batch"),
+    ], concurrency=16, queue_size=32, queue_timeout=5),
+], max_loop_lag_ms=ADMISSION_MAX_LOOP_LAG_MS)
+
+# Innermost middleware, so rejections still get CORS headers and show up in profiling
+app.add_middleware(admission.AdmissionMiddleware, controller=admission_control)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -26,10 +82,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response Compression (brotli/gzip; public /api/cms/ bodies are cached per content version)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+    cache_entries=int(os.getenv("COMPRESSION_CACHE_ENTRIES", "256")),
+)
+
+# Profiling & Slow-Operation Log Configuration
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_COMMAND_MS = float(os.getenv("SLOW_COMMAND_MS", "100"))
+SLOW_LOG_RETENTION_DAYS = float(os.getenv("SLOW_LOG_RETENTION_DAYS", "14"))
+SLOW_LOG_FLUSH_SECONDS = float(os.getenv("SLOW_LOG_FLUSH_SECONDS", "5"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "1.0"))
+slow_log = profiling.SlowOperationLog(SLOW_REQUEST_MS, SLOW_COMMAND_MS, SLOW_LOG_RETENTION_DAYS)
+
 # MongoDB Connection
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
-client = AsyncIOMotorClient(MONGO_URL)
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "10"))
+# Public content reads may go to secondaries within a bounded staleness; admin reads,
+# reads-after-write and auth lookups always use the primary through `db`
+PUBLIC_READ_PREFERENCE = os.getenv("PUBLIC_READ_PREFERENCE", "primary")
+PUBLIC_READ_MAX_STALENESS_SECONDS = int(os.getenv("PUBLIC_READ_MAX_STALENESS_SECONDS", "90"))
+server_load = read_routing.ServerLoadCounter()
+# connect=False defers topology monitoring until first use so importing the app stays cheap
+client = AsyncIOMotorClient(MONGO_URL, connect=False, minPoolSize=MONGO_MIN_POOL_SIZE,
+                            event_listeners=[profiling.CommandTimer(slow_log), server_load])
 db = client.aham_cms
+public_db = client.get_database("aham_cms", read_preference=read_routing.read_preference(
+    PUBLIC_READ_PREFERENCE, PUBLIC_READ_MAX_STALENESS_SECONDS))
 
 # JWT Configuration
 SECRET_KEY = os.getenv("JWT_SECRET", "your-super-secret-jwt-key-change-in-production")
@@ -41,11 +122,54 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
 # Upload Configuration
-UPLOAD_DIR = Path("/app/uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "/app/uploads"))
 MAX_FILE_SIZE = 2 * 1024 * 1024  # 2MB
-
-app.mount("/uploads", StaticFiles(directory="/app/uploads"), name="uploads")
+THUMBNAIL_SIZE = (320, 320)
+MEDIA_PAGE_SIZE = 50
+MAX_MEDIA_PAGE_SIZE = 200
+MEDIA_GC_GRACE_HOURS = float(os.getenv("MEDIA_GC_GRACE_HOURS", "168"))  # 7 days
+MEDIA_GC_INTERVAL_SECONDS = int(os.getenv("MEDIA_GC_INTERVAL_SECONDS", "3600"))
+MEDIA_UPLOAD_WORKERS = int(os.getenv("MEDIA_UPLOAD_WORKERS", str(min(4, os.cpu_count() or 1))))
+MAX_BATCH_UPLOAD_FILES = int(os.getenv("MAX_BATCH_UPLOAD_FILES", "100"))
+
+# EMI Engine Configuration
+MAX_EMI_BATCH = int(os.getenv("MAX_EMI_BATCH", "50000"))
+MAX_REPORT_SCENARIOS = int(os.getenv("MAX_REPORT_SCENARIOS", "20"))
+
+# Public Content Configuration
+SUPPORTED_LANGUAGES = ("en", "ta")
+DEFAULT_LANGUAGE = "en"
+PUBLIC_CACHE_SECONDS = int(os.getenv("PUBLIC_CACHE_SECONDS", "60"))
+PUBLIC_READ_TTL_SECONDS = float(os.getenv("PUBLIC_READ_TTL_SECONDS", "10"))
+PUBLIC_READ_STALE_SECONDS = float(os.getenv("PUBLIC_READ_STALE_SECONDS", "30"))
+
+# Eligibility Configuration
+ELIGIBILITY_REFRESH_SECONDS = int(os.getenv("ELIGIBILITY_REFRESH_SECONDS", "60"))
+MAX_ELIGIBILITY_BATCH = int(os.getenv("MAX_ELIGIBILITY_BATCH", "10000"))
+EMI_CONFIG_REFRESH_SECONDS = int(os.getenv("EMI_CONFIG_REFRESH_SECONDS", "60"))
+
+# Audit Log Configuration
+MAX_AUDIT_LOG_LIMIT = int(os.getenv("MAX_AUDIT_LOG_LIMIT", "1000"))
+
+# Warm-up Configuration
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", str(MONGO_MIN_POOL_SIZE)))
+READINESS_TIMEOUT_SECONDS = float(os.getenv("READINESS_TIMEOUT_SECONDS", "2"))
+
+# Media Storage (MEDIA_STORAGE=local|s3); stored URLs stay /uploads/<key> for either backend
+media_store = media_storage.from_env(UPLOAD_DIR)
+
+if media_store.serves_locally:
+    # Upload directories are created during warm-up, not import
+    app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR), check_dir=False), name="uploads")
+else:
+    @app.get("/uploads/{key:path}")
+    async def serve_upload(key: str):
+        # Object storage serves the bytes; the redirect stays cacheable while the URL is valid
+        return RedirectResponse(
+            media_store.read_url(key),
+            status_code=307,
+            headers={"Cache-Control": f"public, max-age={media_store.presign_seconds // 2}"},
+        )
 
 # ===== MODELS =====
 
@@ -140,6 +264,33 @@ class EMICalculator(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class EMIPrepayment(BaseModel):
+    month: int = Field(ge=1)
+    amount: float = Field(gt=0)
+
+class EMIComputeRequest(BaseModel):
+    principal: float = Field(gt=0, le=1_000_000_000)
+    annual_rate: Optional[float] = Field(default=None, ge=0, le=50)
+    tenure_months: Optional[int] = Field(default=None, ge=1, le=600)
+    prepayments: List[EMIPrepayment] = []
+    prepayment_mode: str = Field(default=emi_engine.REDUCE_TENURE, pattern="^(reduce_tenure|reduce_emi)$")
+    step_up_percent: float = Field(default=0.0, ge=0, le=100)
+    include_schedule: bool = True
+
+class EMIReportScenario(EMIComputeRequest):
+    label: Optional[str] = None
+
+class EMIReportRequest(BaseModel):
+    scenarios: List[EMIReportScenario] = Field(min_length=1)
+    format: str = Field(default="csv", pattern="^(csv|xlsx)$")
+
+class EMIBatchRequest(BaseModel):
+    # Columnar inputs; a list of length 1 is broadcast across the batch.
+    # Same bounds as EMIComputeRequest, which also keep the EMI finite.
+    principal: List[Annotated[float, Field(gt=0, le=1_000_000_000)]] = Field(min_length=1)
+    annual_rate: List[Annotated[float, Field(ge=0, le=50)]] = Field(min_length=1)
+    tenure_months: List[Annotated[int, Field(ge=1, le=600)]] = Field(min_length=1)
+
 class EligibilityQuestion(BaseModel):
     question_en: str
     question_ta: str
@@ -151,6 +302,16 @@ class EligibilityQuestion(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class EligibilityScoreRequest(BaseModel):
+    answers: Dict[str, Any]
+
+class EligibilityApplicant(BaseModel):
+    id: Optional[str] = None
+    answers: Dict[str, Any]
+
+class EligibilityBatchRequest(BaseModel):
+    records: List[EligibilityApplicant]
+
 class Testimonial(BaseModel):
     name: str
     location: str
@@ -206,6 +367,9 @@ class MediaItem(BaseModel):
     alt_text_en: str = ""
     alt_text_ta: str = ""
     file_size: int
+    thumbnail_url: str = ""
+    width: int = 0
+    height: int = 0
     uploaded_by: str
     uploaded_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -222,10 +386,12 @@ class AuditLog(BaseModel):
 # ===== AUTHENTICATION HELPERS =====
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with profiling.phase("bcrypt"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    with profiling.phase("bcrypt"):
+        return pwd_context.hash(password)
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
@@ -265,6 +431,100 @@ async def log_audit(user_email: str, section: str, action: str, record_id: str,
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
     await db.audit_logs.insert_one(audit_entry)
+    await audit_rollups.record(db, audit_entry)
+
+# ===== PROFILING =====
+
+async def authorize_profiling(token: str) -> bool:
+    # Profiles expose internals, so only admins can request one
+    try:
+        email = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return False
+    user = await db.users.find_one({"email": email}, {"role": 1}) if email else None
+    return bool(user) and user.get("role") == "admin"
+
+# Outermost middleware: timings include compression; X-Profile: 1 from an admin profiles the request
+app.add_middleware(
+    profiling.ProfilingMiddleware,
+    slow_log=slow_log,
+    authorize=authorize_profiling,
+    sample_rate=PROFILE_SAMPLE_RATE,
+)
+
+# ===== LANGUAGE PROJECTION =====
+
+def negotiate_language(accept_language: Optional[str]) -> str:
+    # Pick the highest-weighted supported language from an Accept-Language header
+    best, best_q = DEFAULT_LANGUAGE, 0.0
+    for part in (accept_language or "").split(","):
+        tag, _, params = part.strip().partition(";")
+        language = tag.strip().lower().split("-")[0]
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if language in SUPPORTED_LANGUAGES and q > best_q:
+            best, best_q = language, q
+    return best
+
+async def content_language(
+    request: Request,
+    response: Response,
+    lang: Optional[str] = Query(default=None, pattern="^(en|ta|auto)$"),
+) -> Optional[str]:
+    # No lang parameter keeps the bilingual payload; lang=auto honours Accept-Language
+    response.headers["Cache-Control"] = f"public, max-age={PUBLIC_CACHE_SECONDS}"
+    if lang == "auto":
+        lang = negotiate_language(request.headers.get("accept-language"))
+        response.headers["Vary"] = "Accept-Language"
+    if lang:
+        response.headers["Content-Language"] = lang
+    return lang
+
+def language_projection(model: type, lang: Optional[str]) -> Optional[Dict[str, int]]:
+    # Exclude the other languages' variants of a model's localized fields in Mongo
+    if not lang:
+        return None
+    bases = [name[:-3] for name in model.model_fields if name.endswith(f"_{DEFAULT_LANGUAGE}")]
+    return {f"{base}_{other}": 0 for base in bases for other in SUPPORTED_LANGUAGES if other != lang}
+
+def localize(value: Any, lang: Optional[str]) -> Any:
+    # Flatten field_<lang> to field and drop other languages, including nested features/stats
+    if not lang:
+        return value
+    if isinstance(value, list):
+        return [localize(item, lang) for item in value]
+    if not isinstance(value, dict):
+        return value
+    suffix = f"_{lang}"
+    others = tuple(f"_{other}" for other in SUPPORTED_LANGUAGES if other != lang)
+    localized = {}
+    for key, item in value.items():
+        if key.endswith(others):
+            continue
+        localized[key[:-len(suffix)] if key.endswith(suffix) else key] = localize(item, lang)
+    return localized
+
+# ===== PUBLIC READ COALESCING =====
+
+# Concurrent identical public reads share one Mongo query and one serialized body
+public_reads = SingleFlightCache(ttl=PUBLIC_READ_TTL_SECONDS, stale_ttl=PUBLIC_READ_STALE_SECONDS)
+
+def serialize_json(content: Any) -> bytes:
+    # Same encoding as JSONResponse.render
+    with profiling.phase("serialize"):
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"), default=str).encode("utf-8")
+
+async def public_read(section: str, lang: Optional[str], loader, response: Response) -> Response:
+    async def load():
+        return serialize_json(await loader(lang))
+    body = await public_reads.get((section, lang), load)
+    # Returning a Response bypasses FastAPI's header merge, so carry over the dependency headers
+    headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # ===== MEDIA UPLOAD HELPER =====
 
@@ -276,60 +536,122 @@ async def optimize_and_save_image(file: UploadFile, user_email: str) -> Dict[str
     if len(contents) > MAX_FILE_SIZE:
         raise HTTPException(status_code=400, detail=f"File size exceeds {MAX_FILE_SIZE / (1024*1024)}MB limit")
     
-    # Open image with Pillow
-    try:
-        image = Image.open(io.BytesIO(contents))
-    except Exception as e:
-        raise HTTPException(status_code=400, detail="Invalid image file")
+    return await save_optimized_image(contents, file.filename, user_email)
+
+# Pillow releases the GIL while resizing/encoding, so a small pool keeps the event loop free
+image_executor = ThreadPoolExecutor(max_workers=MEDIA_UPLOAD_WORKERS, thread_name_prefix="image")
+
+async def save_optimized_image(contents: bytes, original_name: str, user_email: str,
+                               extra_fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    media_doc = await process_image_in_pool(contents, original_name, user_email, extra_fields)
+    result = await db.media_library.insert_one(media_doc)
+    media_doc["_id"] = str(result.inserted_id)
     
-    # Convert to RGB if necessary
-    if image.mode in ("RGBA", "P"):
-        image = image.convert("RGB")
+    return media_doc
+
+async def process_image_in_pool(contents: bytes, original_name: str, user_email: str,
+                                extra_fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    # Copy the context so the worker's time is charged to the request's "image" phase
+    context = contextvars.copy_context()
+    job = functools.partial(context.run, process_image, contents, original_name, user_email, extra_fields)
+    return await asyncio.get_running_loop().run_in_executor(image_executor, job)
+
+def process_image(contents: bytes, original_name: str, user_email: str,
+                  extra_fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Write the WebP and thumbnail files; returns the media_library document, not yet inserted."""
+    # Decode, resize and encode; timed as the "image" phase for request profiles
+    with profiling.phase("image"):
+        # Open image with Pillow
+        try:
+            image = Image.open(io.BytesIO(contents))
+        except Exception as e:
+            raise HTTPException(status_code=400, detail="Invalid image file")
     
-    # Resize if width > 1920px
-    if image.width > 1920:
-        ratio = 1920 / image.width
-        new_height = int(image.height * ratio)
-        image = image.resize((1920, new_height), Image.Resampling.LANCZOS)
+        # Convert to RGB if necessary
+        if image.mode in ("RGBA", "P"):
+            image = image.convert("RGB")
     
-    # Generate unique filename
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    file_name = f"{timestamp}_{file.filename.rsplit('.', 1)[0]}.webp"
-    file_path = UPLOAD_DIR / file_name
+        # Resize if width > 1920px
+        if image.width > 1920:
+            ratio = 1920 / image.width
+            new_height = int(image.height * ratio)
+            image = image.resize((1920, new_height), Image.Resampling.LANCZOS)
     
-    # Save as WebP
-    image.save(file_path, "WEBP", quality=85, optimize=True)
+        # Generate unique filename
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+        # The client's file name only seeds the storage key, so keep it to safe characters
+        stem = re.sub(r"[^A-Za-z0-9_-]+", "-", original_name.rsplit('.', 1)[0]).strip("-")[:80] or "image"
+        file_name = f"{timestamp}_{stem}.webp"
+        if media_store.exists(file_name):
+            file_name = f"{timestamp}_{stem}_{uuid.uuid4().hex[:6]}.webp"
+    
+        # Save as WebP
+        encoded = io.BytesIO()
+        image.save(encoded, "WEBP", quality=85, optimize=True)
+    
+        # Small grid thumbnail so the media picker never loads full-size files
+        thumbnail = image.copy()
+        thumbnail.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+        encoded_thumbnail = io.BytesIO()
+        thumbnail.save(encoded_thumbnail, "WEBP", quality=75)
     
     # Get file size
-    file_size = file_path.stat().st_size
+    file_size = encoded.tell()
+    
+    # Stream both renditions to the storage backend
+    encoded.seek(0)
+    media_store.put(file_name, encoded, "image/webp")
+    encoded_thumbnail.seek(0)
+    media_store.put(f"thumbs/{file_name}", encoded_thumbnail, "image/webp")
     
     # Save to database
     media_doc = {
         "file_name": file_name,
         "url": f"/uploads/{file_name}",
+        "thumbnail_url": f"/uploads/thumbs/{file_name}",
+        "width": image.width,
+        "height": image.height,
         "alt_text_en": "",
         "alt_text_ta": "",
         "file_size": file_size,
         "uploaded_by": user_email,
         "uploaded_at": datetime.now(timezone.utc).isoformat()
     }
-    result = await db.media_library.insert_one(media_doc)
-    media_doc["_id"] = str(result.inserted_id)
-    
+    # Not used anywhere yet; the grace period gives editors time to reference it
+    media_doc["unreferenced_since"] = media_doc["uploaded_at"]
+    media_doc.update(extra_fields or {})
     return media_doc
 
 # ===== ROOT & HEALTH CHECK =====
 
 @app.get("/api/health")
 async def health_check():
+    # Liveness only: the process is up and serving requests
     return {"status": "healthy", "service": "AHAM CMS API"}
 
+@app.get("/api/health/ready")
+async def readiness_check():
+    checks = {"warm_up": readiness_state["warmed_up"]}
+    try:
+        await asyncio.wait_for(db.command("ping"), READINESS_TIMEOUT_SECONDS)
+        checks["mongo"] = True
+        checks["indexes"] = await missing_indexes() == []
+    except Exception:
+        checks["mongo"] = False
+        checks["indexes"] = False
+    ready = all(checks.values())
+    body = {"status": "ready" if ready else "not_ready", "checks": checks}
+    if readiness_state["error"]:
+        body["warm_up_error"] = readiness_state["error"]
+    return JSONResponse(body, status_code=200 if ready else 503)
+
 # ===== AUTHENTICATION ENDPOINTS =====
 
 @app.post("/api/admin/login", response_model=TokenResponse)
 async def admin_login(credentials: UserLogin):
     user = await db.users.find_one({"email": credentials.email})
-    if not user or not verify_password(credentials.password, user["password_hash"]):
+    # bcrypt runs in a worker thread so a burst of logins doesn't stall the event loop
+    if not user or not await asyncio.to_thread(verify_password, credentials.password, user["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     # Update last login
@@ -386,7 +708,7 @@ async def create_user(new_user: UserCreate, user: dict = Depends(require_admin))
     user_doc = {
         "name": new_user.name,
         "email": new_user.email,
-        "password_hash": get_password_hash(new_user.password),
+        "password_hash": await asyncio.to_thread(get_password_hash, new_user.password),
         "role": new_user.role,
         "created_at": datetime.now(timezone.utc).isoformat(),
         "last_login": None
@@ -411,12 +733,15 @@ async def delete_user(user_id: str, user: dict = Depends(require_admin)):
 
 # ===== BANNERS ENDPOINTS =====
 
-@app.get("/api/cms/banners")
-async def get_public_banners():
-    banners = await db.banners.find({"status": True}).sort("order_index", 1).to_list(100)
+async def load_public_banners(lang: Optional[str]):
+    banners = await public_db.banners.find({"status": True}, language_projection(Banner, lang)).sort("order_index", 1).to_list(100)
     for banner in banners:
         banner["_id"] = str(banner["_id"])
-    return banners
+    return localize(banners, lang)
+
+@app.get("/api/cms/banners")
+async def get_public_banners(response: Response, lang: Optional[str] = Depends(content_language)):
+    return await public_read("banners", lang, load_public_banners, response)
 
 @app.get("/api/admin/banners")
 async def get_all_banners(user: dict = Depends(require_admin)):
@@ -433,6 +758,8 @@ async def create_banner(banner: Banner, user: dict = Depends(require_admin)):
     
     result = await db.banners.insert_one(banner_doc)
     await log_audit(user["email"], "banners", "create", str(result.inserted_id), new_value=banner_doc)
+    public_reads.invalidate("banners")
+    await media_references.sync_record(db, "banners", str(result.inserted_id), banner_doc)
     
     return {"message": "Banner created", "id": str(result.inserted_id)}
 
@@ -447,6 +774,8 @@ async def update_banner(banner_id: str, banner: Banner, user: dict = Depends(req
     
     await db.banners.update_one({"_id": ObjectId(banner_id)}, {"$set": banner_doc})
     await log_audit(user["email"], "banners", "update", banner_id, old_value=old_banner, new_value=banner_doc)
+    public_reads.invalidate("banners")
+    await media_references.sync_record(db, "banners", banner_id, banner_doc)
     
     return {"message": "Banner updated"}
 
@@ -457,16 +786,21 @@ async def delete_banner(banner_id: str, user: dict = Depends(require_admin)):
         raise HTTPException(status_code=404, detail="Banner not found")
     
     await log_audit(user["email"], "banners", "delete", banner_id)
+    public_reads.invalidate("banners")
+    await media_references.sync_record(db, "banners", banner_id)
     return {"message": "Banner deleted"}
 
 # ===== PRODUCTS ENDPOINTS =====
 
-@app.get("/api/cms/products")
-async def get_public_products():
-    products = await db.products.find({"status": True}).sort("order_index", 1).to_list(100)
+async def load_public_products(lang: Optional[str]):
+    products = await public_db.products.find({"status": True}, language_projection(Product, lang)).sort("order_index", 1).to_list(100)
     for product in products:
         product["_id"] = str(product["_id"])
-    return products
+    return localize(products, lang)
+
+@app.get("/api/cms/products")
+async def get_public_products(response: Response, lang: Optional[str] = Depends(content_language)):
+    return await public_read("products", lang, load_public_products, response)
 
 @app.get("/api/admin/products")
 async def get_all_products(user: dict = Depends(require_admin)):
@@ -483,6 +817,8 @@ async def create_product(product: Product, user: dict = Depends(require_admin)):
     
     result = await db.products.insert_one(product_doc)
     await log_audit(user["email"], "products", "create", str(result.inserted_id), new_value=product_doc)
+    public_reads.invalidate("products")
+    await media_references.sync_record(db, "products", str(result.inserted_id), product_doc)
     
     return {"message": "Product created", "id": str(result.inserted_id)}
 
@@ -497,6 +833,8 @@ async def update_product(product_id: str, product: Product, user: dict = Depends
     
     await db.products.update_one({"_id": ObjectId(product_id)}, {"$set": product_doc})
     await log_audit(user["email"], "products", "update", product_id, old_value=old_product, new_value=product_doc)
+    public_reads.invalidate("products")
+    await media_references.sync_record(db, "products", product_id, product_doc)
     
     return {"message": "Product updated"}
 
@@ -507,16 +845,21 @@ async def delete_product(product_id: str, user: dict = Depends(require_admin)):
         raise HTTPException(status_code=404, detail="Product not found")
     
     await log_audit(user["email"], "products", "delete", product_id)
+    public_reads.invalidate("products")
+    await media_references.sync_record(db, "products", product_id)
     return {"message": "Product deleted"}
 
 # ===== TESTIMONIALS ENDPOINTS =====
 
-@app.get("/api/cms/testimonials")
-async def get_public_testimonials():
-    testimonials = await db.testimonials.find({"status": True}).sort("order_index", 1).to_list(100)
+async def load_public_testimonials(lang: Optional[str]):
+    testimonials = await public_db.testimonials.find({"status": True}, language_projection(Testimonial, lang)).sort("order_index", 1).to_list(100)
     for testimonial in testimonials:
         testimonial["_id"] = str(testimonial["_id"])
-    return testimonials
+    return localize(testimonials, lang)
+
+@app.get("/api/cms/testimonials")
+async def get_public_testimonials(response: Response, lang: Optional[str] = Depends(content_language)):
+    return await public_read("testimonials", lang, load_public_testimonials, response)
 
 @app.get("/api/admin/testimonials")
 async def get_all_testimonials(user: dict = Depends(require_admin)):
@@ -533,6 +876,8 @@ async def create_testimonial(testimonial: Testimonial, user: dict = Depends(requ
     
     result = await db.testimonials.insert_one(testimonial_doc)
     await log_audit(user["email"], "testimonials", "create", str(result.inserted_id), new_value=testimonial_doc)
+    public_reads.invalidate("testimonials")
+    await media_references.sync_record(db, "testimonials", str(result.inserted_id), testimonial_doc)
     
     return {"message": "Testimonial created", "id": str(result.inserted_id)}
 
@@ -547,6 +892,8 @@ async def update_testimonial(testimonial_id: str, testimonial: Testimonial, user
     
     await db.testimonials.update_one({"_id": ObjectId(testimonial_id)}, {"$set": testimonial_doc})
     await log_audit(user["email"], "testimonials", "update", testimonial_id, old_value=old_testimonial, new_value=testimonial_doc)
+    public_reads.invalidate("testimonials")
+    await media_references.sync_record(db, "testimonials", testimonial_id, testimonial_doc)
     
     return {"message": "Testimonial updated"}
 
@@ -557,16 +904,21 @@ async def delete_testimonial(testimonial_id: str, user: dict = Depends(require_a
         raise HTTPException(status_code=404, detail="Testimonial not found")
     
     await log_audit(user["email"], "testimonials", "delete", testimonial_id)
+    public_reads.invalidate("testimonials")
+    await media_references.sync_record(db, "testimonials", testimonial_id)
     return {"message": "Testimonial deleted"}
 
 # ===== ABOUT/STATS ENDPOINTS =====
 
-@app.get("/api/cms/about-stats")
-async def get_public_about_stats():
-    about = await db.about_stats.find_one({"status": True})
+async def load_public_about_stats(lang: Optional[str]):
+    about = await public_db.about_stats.find_one({"status": True}, language_projection(About, lang))
     if about:
         about["_id"] = str(about["_id"])
-    return about or {}
+    return localize(about, lang) or {}
+
+@app.get("/api/cms/about-stats")
+async def get_public_about_stats(response: Response, lang: Optional[str] = Depends(content_language)):
+    return await public_read("about_stats", lang, load_public_about_stats, response)
 
 @app.get("/api/admin/about-stats")
 async def get_admin_about_stats(user: dict = Depends(require_admin)):
@@ -583,6 +935,7 @@ async def create_about_stats(about: About, user: dict = Depends(require_admin)):
     
     result = await db.about_stats.insert_one(about_doc)
     await log_audit(user["email"], "about_stats", "create", str(result.inserted_id), new_value=about_doc)
+    public_reads.invalidate("about_stats")
     
     return {"message": "About/Stats created", "id": str(result.inserted_id)}
 
@@ -597,17 +950,21 @@ async def update_about_stats(about_id: str, about: About, user: dict = Depends(r
     
     await db.about_stats.update_one({"_id": ObjectId(about_id)}, {"$set": about_doc})
     await log_audit(user["email"], "about_stats", "update", about_id, old_value=old_about, new_value=about_doc)
+    public_reads.invalidate("about_stats")
     
     return {"message": "About/Stats updated"}
 
 # ===== FOOTER ENDPOINTS =====
 
-@app.get("/api/cms/footer")
-async def get_public_footer():
-    footer = await db.footer.find_one({"status": True})
+async def load_public_footer(lang: Optional[str]):
+    footer = await public_db.footer.find_one({"status": True}, language_projection(Footer, lang))
     if footer:
         footer["_id"] = str(footer["_id"])
-    return footer or {}
+    return localize(footer, lang) or {}
+
+@app.get("/api/cms/footer")
+async def get_public_footer(response: Response, lang: Optional[str] = Depends(content_language)):
+    return await public_read("footer", lang, load_public_footer, response)
 
 @app.get("/api/admin/footer")
 async def get_admin_footer(user: dict = Depends(require_admin)):
@@ -624,6 +981,7 @@ async def create_footer(footer: Footer, user: dict = Depends(require_admin)):
     
     result = await db.footer.insert_one(footer_doc)
     await log_audit(user["email"], "footer", "create", str(result.inserted_id), new_value=footer_doc)
+    public_reads.invalidate("footer")
     
     return {"message": "Footer created", "id": str(result.inserted_id)}
 
@@ -638,17 +996,21 @@ async def update_footer(footer_id: str, footer: Footer, user: dict = Depends(req
     
     await db.footer.update_one({"_id": ObjectId(footer_id)}, {"$set": footer_doc})
     await log_audit(user["email"], "footer", "update", footer_id, old_value=old_footer, new_value=footer_doc)
+    public_reads.invalidate("footer")
     
     return {"message": "Footer updated"}
 
 # ===== EMI CALCULATOR ENDPOINTS =====
 
-@app.get("/api/cms/emi-calculator")
-async def get_public_emi_calculator():
-    emi = await db.emi_calculator.find_one({"status": True})
+async def load_public_emi_calculator(lang: Optional[str]):
+    emi = await public_db.emi_calculator.find_one({"status": True}, language_projection(EMICalculator, lang))
     if emi:
         emi["_id"] = str(emi["_id"])
-    return emi or {}
+    return localize(emi, lang) or {}
+
+@app.get("/api/cms/emi-calculator")
+async def get_public_emi_calculator(response: Response, lang: Optional[str] = Depends(content_language)):
+    return await public_read("emi_calculator", lang, load_public_emi_calculator, response)
 
 @app.get("/api/admin/emi-calculator")
 async def get_admin_emi_calculator(user: dict = Depends(require_admin)):
@@ -665,6 +1027,8 @@ async def create_emi_calculator(emi: EMICalculator, user: dict = Depends(require
     
     result = await db.emi_calculator.insert_one(emi_doc)
     await log_audit(user["email"], "emi_calculator", "create", str(result.inserted_id), new_value=emi_doc)
+    public_reads.invalidate("emi_calculator")
+    await refresh_emi_defaults()
     
     return {"message": "EMI Calculator created", "id": str(result.inserted_id)}
 
@@ -679,17 +1043,216 @@ async def update_emi_calculator(emi_id: str, emi: EMICalculator, user: dict = De
     
     await db.emi_calculator.update_one({"_id": ObjectId(emi_id)}, {"$set": emi_doc})
     await log_audit(user["email"], "emi_calculator", "update", emi_id, old_value=old_emi, new_value=emi_doc)
+    public_reads.invalidate("emi_calculator")
+    await refresh_emi_defaults()
     
     return {"message": "EMI Calculator updated"}
 
+# Active EMI calculator defaults, cached like the eligibility scorer and refreshed on admin edits
+emi_config_state: Dict[str, Any] = {"defaults": None, "loaded_at": 0.0}
+
+async def refresh_emi_defaults() -> Dict[str, Any]:
+    emi = await db.emi_calculator.find_one({"status": True}) or {}
+    emi_config_state["defaults"] = {
+        "annual_rate": emi.get("default_interest", 8.5),
+        "tenure_months": emi.get("default_tenure", 240),
+    }
+    emi_config_state["loaded_at"] = time.monotonic()
+    return emi_config_state["defaults"]
+
+async def get_emi_defaults() -> Dict[str, Any]:
+    if emi_config_state["defaults"] is None or time.monotonic() - emi_config_state["loaded_at"] > EMI_CONFIG_REFRESH_SECONDS:
+        return await refresh_emi_defaults()
+    return emi_config_state["defaults"]
+
+async def resolve_emi_scenario(request: EMIComputeRequest, defaults: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    annual_rate, tenure_months = request.annual_rate, request.tenure_months
+    if annual_rate is None or tenure_months is None:
+        defaults = defaults or await get_emi_defaults()
+        annual_rate = defaults["annual_rate"] if annual_rate is None else annual_rate
+        tenure_months = defaults["tenure_months"] if tenure_months is None else tenure_months
+
+    prepayments: Dict[int, float] = {}
+    for prepayment in request.prepayments:
+        if prepayment.month > tenure_months:
+            raise HTTPException(status_code=400, detail=f"Prepayment month {prepayment.month} exceeds tenure")
+        prepayments[prepayment.month] = prepayments.get(prepayment.month, 0.0) + prepayment.amount
+
+    return {
+        "principal": request.principal,
+        "annual_rate": annual_rate,
+        "tenure_months": tenure_months,
+        "prepayments": prepayments,
+        "prepayment_mode": request.prepayment_mode,
+        "step_up_percent": request.step_up_percent,
+    }
+
+@app.post("/api/cms/emi-calculator/compute")
+async def compute_emi(request: EMIComputeRequest):
+    scenario = await resolve_emi_scenario(request)
+    return emi_engine.amortize(**scenario, include_schedule=request.include_schedule)
+
+async def stream_emi_report(scenarios: List[EMIReportScenario], report_format: str, http_request: Request):
+    if len(scenarios) > MAX_REPORT_SCENARIOS:
+        raise HTTPException(status_code=400, detail=f"Reports support at most {MAX_REPORT_SCENARIOS} scenarios")
+    defaults = await get_emi_defaults()
+    resolved = []
+    for index, scenario in enumerate(scenarios, start=1):
+        resolved_scenario = await resolve_emi_scenario(scenario, defaults)
+        resolved_scenario["label"] = scenario.label or f"Scenario {index}"
+        resolved.append(resolved_scenario)
+
+    if report_format == "xlsx":
+        return StreamingResponse(
+            reports.iter_xlsx_report(resolved),
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            headers={"Content-Disposition": 'attachment; filename="emi-report.xlsx"'},
+        )
+
+    headers = {"Content-Disposition": 'attachment; filename="emi-report.csv"', "Vary": "Accept-Encoding"}
+    body = reports.iter_csv_report(resolved)
+    # The report is streamed through gzip only, so br is not offered here
+    if choose_encoding(http_request.headers.get("accept-encoding", ""), available=("gzip",)) == "gzip":
+        body = reports.gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type="text/csv; charset=utf-8", headers=headers)
+
+@app.get("/api/cms/emi-calculator/report")
+async def download_emi_report(
+    http_request: Request,
+    principal: float = Query(gt=0, le=1_000_000_000),
+    annual_rate: Optional[float] = Query(default=None, ge=0, le=50),
+    tenure_months: Optional[int] = Query(default=None, ge=1, le=600),
+    step_up_percent: float = Query(default=0.0, ge=0, le=100),
+    format: str = Query(default="csv", pattern="^(csv|xlsx)$"),
+):
+    scenario = EMIReportScenario(principal=principal, annual_rate=annual_rate,
+                                 tenure_months=tenure_months, step_up_percent=step_up_percent)
+    return await stream_emi_report([scenario], format, http_request)
+
+@app.post("/api/cms/emi-calculator/report")
+async def download_emi_scenarios_report(report: EMIReportRequest, http_request: Request):
+    return await stream_emi_report(report.scenarios, report.format, http_request)
+
+@app.post("/api/cms/emi-calculator/batch")
+async def compute_emi_batch(request: EMIBatchRequest):
+    columns = [request.principal, request.annual_rate, request.tenure_months]
+    size = max(len(column) for column in columns)
+    if size > MAX_EMI_BATCH:
+        raise HTTPException(status_code=400, detail=f"Batch size exceeds {MAX_EMI_BATCH} scenarios")
+    if any(len(column) not in (1, size) for column in columns):
+        raise HTTPException(status_code=400, detail="principal, annual_rate and tenure_months must have equal length or length 1")
+
+    summary = emi_engine.batch_summary(*columns)
+    # Plain float lists; skip jsonable_encoder's per-element walk
+    return JSONResponse({
+        "count": size,
+        "emi": summary["emi"].round(2).tolist(),
+        "total_interest": summary["total_interest"].round(2).tolist(),
+        "total_payment": summary["total_payment"].round(2).tolist(),
+    })
+
+# ===== ELIGIBILITY SCORECARD ENDPOINTS =====
+
+# Compiled score_map lookups, rebuilt on admin edits and at most every
+# ELIGIBILITY_REFRESH_SECONDS so edits made through other workers are picked up
+eligibility_state: Dict[str, Any] = {"scorer": None, "questions": [], "loaded_at": 0.0}
+
+async def refresh_eligibility_scorer() -> EligibilityScorer:
+    questions = await db.eligibility_questions.find({"status": True}).sort("order_index", 1).to_list(1000)
+    eligibility_state["scorer"] = EligibilityScorer(questions)
+    eligibility_state["questions"] = [
+        {
+            "_id": str(q["_id"]),
+            "question_en": q["question_en"],
+            "question_ta": q["question_ta"],
+            "question_type": q["question_type"],
+            "options": q.get("options", []),
+            "order_index": q.get("order_index", 0),
+        }
+        for q in questions
+    ]
+    eligibility_state["loaded_at"] = time.monotonic()
+    return eligibility_state["scorer"]
+
+async def get_eligibility_scorer() -> EligibilityScorer:
+    if eligibility_state["scorer"] is None or time.monotonic() - eligibility_state["loaded_at"] > ELIGIBILITY_REFRESH_SECONDS:
+        return await refresh_eligibility_scorer()
+    return eligibility_state["scorer"]
+
+@app.get("/api/cms/eligibility-questions")
+async def get_public_eligibility_questions(lang: Optional[str] = Depends(content_language)):
+    await get_eligibility_scorer()
+    return localize(eligibility_state["questions"], lang)
+
+@app.post("/api/cms/eligibility/score")
+async def score_eligibility(request: EligibilityScoreRequest):
+    scorer = await get_eligibility_scorer()
+    return scorer.score(request.answers)
+
+@app.post("/api/admin/eligibility/score-batch")
+async def score_eligibility_batch(request: EligibilityBatchRequest, user: dict = Depends(require_admin)):
+    if len(request.records) > MAX_ELIGIBILITY_BATCH:
+        raise HTTPException(status_code=400, detail=f"Batch size exceeds {MAX_ELIGIBILITY_BATCH} records")
+    scorer = await get_eligibility_scorer()
+    results = scorer.score_many(record.dict() for record in request.records)
+    return {"count": len(results), "max_score": scorer.max_score, "results": results}
+
+@app.get("/api/admin/eligibility-questions")
+async def get_all_eligibility_questions(user: dict = Depends(require_admin)):
+    questions = await db.eligibility_questions.find({}).sort("order_index", 1).to_list(1000)
+    for question in questions:
+        question["_id"] = str(question["_id"])
+    return questions
+
+@app.post("/api/admin/eligibility-questions")
+async def create_eligibility_question(question: EligibilityQuestion, user: dict = Depends(require_admin)):
+    question_doc = question.dict()
+    question_doc["created_at"] = datetime.now(timezone.utc).isoformat()
+    question_doc["updated_at"] = datetime.now(timezone.utc).isoformat()
+    
+    result = await db.eligibility_questions.insert_one(question_doc)
+    await log_audit(user["email"], "eligibility_questions", "create", str(result.inserted_id), new_value=question_doc)
+    await refresh_eligibility_scorer()
+    
+    return {"message": "Eligibility question created", "id": str(result.inserted_id)}
+
+@app.put("/api/admin/eligibility-questions/{question_id}")
+async def update_eligibility_question(question_id: str, question: EligibilityQuestion, user: dict = Depends(require_admin)):
+    old_question = await db.eligibility_questions.find_one({"_id": ObjectId(question_id)})
+    if not old_question:
+        raise HTTPException(status_code=404, detail="Eligibility question not found")
+    
+    question_doc = question.dict()
+    question_doc["updated_at"] = datetime.now(timezone.utc).isoformat()
+    
+    await db.eligibility_questions.update_one({"_id": ObjectId(question_id)}, {"$set": question_doc})
+    await log_audit(user["email"], "eligibility_questions", "update", question_id, old_value=old_question, new_value=question_doc)
+    await refresh_eligibility_scorer()
+    
+    return {"message": "Eligibility question updated"}
+
+@app.delete("/api/admin/eligibility-questions/{question_id}")
+async def delete_eligibility_question(question_id: str, user: dict = Depends(require_admin)):
+    result = await db.eligibility_questions.delete_one({"_id": ObjectId(question_id)})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Eligibility question not found")
+    
+    await log_audit(user["email"], "eligibility_questions", "delete", question_id)
+    await refresh_eligibility_scorer()
+    return {"message": "Eligibility question deleted"}
+
 # ===== ARTICLES ENDPOINTS =====
 
-@app.get("/api/cms/articles")
-async def get_public_articles():
-    articles = await db.articles.find({"status": True}).sort("published_date", -1).to_list(100)
+async def load_public_articles(lang: Optional[str]):
+    articles = await public_db.articles.find({"status": True}, language_projection(Article, lang)).sort("published_date", -1).to_list(100)
     for article in articles:
         article["_id"] = str(article["_id"])
-    return articles
+    return localize(articles, lang)
+
+@app.get("/api/cms/articles")
+async def get_public_articles(response: Response, lang: Optional[str] = Depends(content_language)):
+    return await public_read("articles", lang, load_public_articles, response)
 
 @app.get("/api/admin/articles")
 async def get_all_articles(user: dict = Depends(require_admin)):
@@ -707,6 +1270,8 @@ async def create_article(article: Article, user: dict = Depends(require_admin)):
     
     result = await db.articles.insert_one(article_doc)
     await log_audit(user["email"], "articles", "create", str(result.inserted_id), new_value=article_doc)
+    public_reads.invalidate("articles")
+    await media_references.sync_record(db, "articles", str(result.inserted_id), article_doc)
     
     return {"message": "Article created", "id": str(result.inserted_id)}
 
@@ -721,6 +1286,8 @@ async def update_article(article_id: str, article: Article, user: dict = Depends
     
     await db.articles.update_one({"_id": ObjectId(article_id)}, {"$set": article_doc})
     await log_audit(user["email"], "articles", "update", article_id, old_value=old_article, new_value=article_doc)
+    public_reads.invalidate("articles")
+    await media_references.sync_record(db, "articles", article_id, article_doc)
     
     return {"message": "Article updated"}
 
@@ -731,6 +1298,8 @@ async def delete_article(article_id: str, user: dict = Depends(require_admin)):
         raise HTTPException(status_code=404, detail="Article not found")
     
     await log_audit(user["email"], "articles", "delete", article_id)
+    public_reads.invalidate("articles")
+    await media_references.sync_record(db, "articles", article_id)
     return {"message": "Article deleted"}
 
 # ===== MEDIA LIBRARY ENDPOINTS =====
@@ -740,42 +1309,374 @@ async def upload_media(file: UploadFile = File(...), user: dict = Depends(requir
     media_doc = await optimize_and_save_image(file, user["email"])
     return media_doc
 
+def unique_upload_names(names: List[str]) -> List[str]:
+    # Files sharing a name would otherwise map to the same timestamped WebP
+    seen = Counter()
+    unique = []
+    for name in names:
+        name = name or "image"
+        seen[name] += 1
+        if seen[name] > 1:
+            stem, dot, ext = name.rpartition(".")
+            name = f"{stem}_{seen[name]}{dot}{ext}" if dot else f"{name}_{seen[name]}"
+        unique.append(name)
+    return unique
+
+async def batch_upload_events(files: List[UploadFile], user_email: str):
+    semaphore = asyncio.Semaphore(MEDIA_UPLOAD_WORKERS)
+    names = unique_upload_names([file.filename for file in files])
+    # Encodes run as their own tasks: cancelling process() can't stop a job already in image_executor
+    encodes: List[asyncio.Task] = []
+
+    async def process(index: int, file: UploadFile):
+        # Reads happen under the semaphore too, so at most MEDIA_UPLOAD_WORKERS files are in memory
+        async with semaphore:
+            try:
+                contents = await file.read()
+                if len(contents) > MAX_FILE_SIZE:
+                    raise HTTPException(status_code=400, detail=f"File size exceeds {MAX_FILE_SIZE / (1024*1024)}MB limit")
+                encode = asyncio.create_task(process_image_in_pool(contents, names[index], user_email))
+                encodes.append(encode)
+                return index, await asyncio.shield(encode), None
+            except Exception as e:
+                return index, None, getattr(e, "detail", None) or str(e)
+
+    results = [None] * len(files)
+    processed: Dict[int, Dict[str, Any]] = {}
+    tasks = [asyncio.create_task(process(index, file)) for index, file in enumerate(files)]
+    inserted = False
+    try:
+        for completed, next_done in enumerate(asyncio.as_completed(tasks), start=1):
+            index, media_doc, error = await next_done
+            if media_doc:
+                processed[index] = media_doc
+            results[index] = {"index": index, "file": files[index].filename,
+                              "status": "processed" if media_doc else "error", "error": error}
+            yield serialize_json({"event": "progress", "completed": completed, "total": len(files),
+                                  **results[index]}) + b"\n"
+
+        # One round trip for the whole batch
+        if processed:
+            try:
+                await db.media_library.insert_many(list(processed.values()), ordered=False)
+                inserted = True
+            except Exception as e:
+                for index in processed:
+                    results[index].update(status="error", error=f"Database insert failed: {e}")
+        if inserted:
+            for index, media_doc in processed.items():
+                media_doc["_id"] = str(media_doc["_id"])
+                results[index].update(status="uploaded", media=media_doc)
+        yield serialize_json({
+            "event": "done",
+            "uploaded": sum(1 for result in results if result["status"] == "uploaded"),
+            "failed": sum(1 for result in results if result["status"] == "error"),
+            "results": results,
+        }) + b"\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Client went away or the insert failed: don't leave files without media_library records.
+        # A disconnect cancels the response's scope, so wait out running encodes shielded from it.
+        with anyio.CancelScope(shield=True):
+            outcomes = await asyncio.gather(*encodes, return_exceptions=True)
+            if not inserted:
+                for media_doc in outcomes:
+                    if isinstance(media_doc, dict):
+                        await remove_media_files(media_doc)
+
+@app.post("/api/admin/media/upload-batch")
+async def upload_media_batch(files: List[UploadFile] = File(...), user: dict = Depends(require_admin)):
+    if len(files) > MAX_BATCH_UPLOAD_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_UPLOAD_FILES} files per batch")
+    # NDJSON: one progress line per file as it finishes, then a summary line
+    return StreamingResponse(batch_upload_events(files, user["email"]), media_type="application/x-ndjson")
+
+# Sort options: (field, direction); _id breaks ties so cursors are stable
+MEDIA_SORTS = {
+    "newest": ("uploaded_at", -1),
+    "oldest": ("uploaded_at", 1),
+    "largest": ("file_size", -1),
+    "smallest": ("file_size", 1),
+    "name": ("file_name", 1),
+}
+
+def encode_media_cursor(item: Dict[str, Any], field: str) -> str:
+    payload = json.dumps({"v": item.get(field), "id": str(item["_id"])})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_media_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return {"v": payload["v"], "id": ObjectId(payload["id"])}
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def utc_isoformat(value: Union[datetime, date], end_of_day: bool = False) -> str:
+    # uploaded_at is stored as an ISO string, so range bounds are compared as ISO strings too
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, dt_time.max if end_of_day else dt_time.min)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
 @app.get("/api/admin/media/library")
-async def get_media_library(user: dict = Depends(require_admin)):
-    media_items = await db.media_library.find({}).sort("uploaded_at", -1).to_list(100)
+async def get_media_library(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=MEDIA_PAGE_SIZE, ge=1, le=MAX_MEDIA_PAGE_SIZE),
+    q: Optional[str] = None,
+    uploaded_by: Optional[str] = None,
+    date_from: Optional[Union[datetime, date]] = None,
+    date_to: Optional[Union[datetime, date]] = None,
+    min_size: Optional[int] = Query(default=None, ge=0),
+    max_size: Optional[int] = Query(default=None, ge=0),
+    sort: str = Query(default="newest", pattern="^(newest|oldest|largest|smallest|name)$"),
+    user: dict = Depends(require_admin),
+):
+    filters: List[Dict[str, Any]] = []
+    if q:
+        filters.append({"file_name": {"$regex": re.escape(q), "$options": "i"}})
+    if uploaded_by:
+        filters.append({"uploaded_by": uploaded_by})
+    if date_from or date_to:
+        uploaded_range = {}
+        if date_from:
+            uploaded_range["$gte"] = utc_isoformat(date_from)
+        if date_to:
+            uploaded_range["$lte"] = utc_isoformat(date_to, end_of_day=True)
+        filters.append({"uploaded_at": uploaded_range})
+    if min_size is not None or max_size is not None:
+        size_range = {}
+        if min_size is not None:
+            size_range["$gte"] = min_size
+        if max_size is not None:
+            size_range["$lte"] = max_size
+        filters.append({"file_size": size_range})
+
+    field, direction = MEDIA_SORTS[sort]
+    if cursor:
+        position = decode_media_cursor(cursor)
+        op = "$lt" if direction < 0 else "$gt"
+        filters.append({"$or": [
+            {field: {op: position["v"]}},
+            {field: position["v"], "_id": {op: position["id"]}},
+        ]})
+
+    query = {"$and": filters} if filters else {}
+    media_items = await db.media_library.find(query).sort([(field, direction), ("_id", direction)]).limit(limit + 1).to_list(limit + 1)
+    next_cursor = encode_media_cursor(media_items[limit - 1], field) if len(media_items) > limit else None
+    media_items = media_items[:limit]
     for item in media_items:
         item["_id"] = str(item["_id"])
-    return media_items
+    return {"items": media_items, "next_cursor": next_cursor}
+
+async def remove_media_files(media: Dict[str, Any]):
+    await asyncio.to_thread(media_store.delete, [media["file_name"], f"thumbs/{media['file_name']}"])
+
+@app.get("/api/admin/media/{media_id}/usage")
+async def get_media_usage(media_id: str, user: dict = Depends(require_admin)):
+    media = await db.media_library.find_one({"_id": ObjectId(media_id)})
+    if not media:
+        raise HTTPException(status_code=404, detail="Media not found")
+    return {"file_name": media["file_name"], "usages": await media_references.usages(db, media["file_name"])}
 
 @app.delete("/api/admin/media/{media_id}")
-async def delete_media(media_id: str, user: dict = Depends(require_admin)):
+async def delete_media(media_id: str, force: bool = False, user: dict = Depends(require_admin)):
     media = await db.media_library.find_one({"_id": ObjectId(media_id)})
     if not media:
         raise HTTPException(status_code=404, detail="Media not found")
     
-    # Delete file from disk
-    file_path = UPLOAD_DIR / media["file_name"]
-    if file_path.exists():
-        file_path.unlink()
+    # Refuse to delete files that content still points at unless forced
+    usages = await media_references.usages(db, media["file_name"])
+    if usages and not force:
+        used_by = ", ".join(f"{u['section']}/{u['record_id']} ({u['field']})" for u in usages)
+        raise HTTPException(status_code=409, detail=f"Media is still in use by {used_by}")
+    
+    await remove_media_files(media)
     
     await db.media_library.delete_one({"_id": ObjectId(media_id)})
     await log_audit(user["email"], "media", "delete", media_id)
     
     return {"message": "Media deleted"}
 
+async def sweep_orphan_media() -> List[str]:
+    cutoff = (datetime.now(timezone.utc) - timedelta(hours=MEDIA_GC_GRACE_HOURS)).isoformat()
+    reclaimed = []
+    async for media in db.media_library.find({"unreferenced_since": {"$ne": None, "$lte": cutoff},
+                                              **media_references.NOT_SYNTHETIC}):
+        # Re-check against the index in case a reference was added since the flag was set
+        if await media_references.usages(db, media["file_name"]):
+            continue
+        await remove_media_files(media)
+        await db.media_library.delete_one({"_id": media["_id"]})
+        reclaimed.append(media["file_name"])
+    if reclaimed:
+        await log_audit("system", "media", "gc", ",".join(reclaimed))
+    return reclaimed
+
+async def media_gc_loop():
+    while True:
+        await asyncio.sleep(MEDIA_GC_INTERVAL_SECONDS)
+        try:
+            reclaimed = await sweep_orphan_media()
+            if reclaimed:
+                print(f"🧹 Reclaimed {len(reclaimed)} orphaned media files")
+        except Exception as e:
+            print(f"❌ Media GC failed: {e}")
+
+@app.post("/api/admin/media/gc")
+async def run_media_gc(user: dict = Depends(require_admin)):
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can run media cleanup")
+    reclaimed = await sweep_orphan_media()
+    return {"message": f"Reclaimed {len(reclaimed)} files", "files": reclaimed}
+
+@app.post("/api/admin/media/mirror-external")
+async def mirror_external_media(concurrency: int = Query(default=8, ge=1, le=32), user: dict = Depends(require_admin)):
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can mirror external media")
+    summary = await image_mirror.mirror_external_images(db, save_optimized_image, concurrency, audit=log_audit)
+    for section in media_references.REFERENCE_FIELDS:
+        public_reads.invalidate(section)
+    return summary
+
+@app.post("/api/admin/media/references/rebuild")
+async def rebuild_media_references(user: dict = Depends(require_admin)):
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can rebuild media references")
+    count = await media_references.rebuild(db)
+    return {"message": "Media references rebuilt", "references": count}
+
+# ===== AUDIT ANALYTICS =====
+
+@app.get("/api/admin/analytics/activity")
+async def get_audit_activity(
+    granularity: str = Query(default="day", pattern="^(hour|day)$"),
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    section: Optional[str] = None,
+    action: Optional[str] = None,
+    user_email: Optional[str] = None,
+    group_by: str = Query(default="section", pattern="^((section|action|user_email)(,(section|action|user_email))*)?$"),
+    user: dict = Depends(require_admin),
+):
+    # date_from/date_to are ISO prefixes, e.g. 2025-10-01 or 2025-10-01T09
+    return await audit_rollups.query(
+        db,
+        granularity,
+        bucket_from=date_from,
+        bucket_to=date_to,
+        filters={"section": section, "action": action, "user_email": user_email},
+        group_by=[dimension for dimension in group_by.split(",") if dimension],
+    )
+
+@app.post("/api/admin/analytics/rebuild")
+async def rebuild_audit_rollups(user: dict = Depends(require_admin)):
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can rebuild analytics")
+    count = await audit_rollups.rebuild(db)
+    return {"message": "Audit rollups rebuilt", "rollups": count}
+
+# ===== METRICS =====
+
+@app.get("/api/admin/metrics")
+async def get_metrics(user: dict = Depends(require_admin)):
+    return {
+        "public_reads": public_reads.metrics(),
+        "slow_operations": slow_log.metrics(),
+        "admission": admission_control.metrics(),
+        "read_routing": {
+            "public_read_preference": PUBLIC_READ_PREFERENCE,
+            "max_staleness_seconds": PUBLIC_READ_MAX_STALENESS_SECONDS,
+            **server_load.snapshot(client.delegate.topology_description),
+        },
+    }
+
+# ===== SLOW-OPERATION LOG =====
+
+@app.get("/api/admin/slow-operations")
+async def get_slow_operations(
+    kind: Optional[str] = Query(default=None, pattern="^(request|command|profile)$"),
+    route: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    user: dict = Depends(require_admin),
+):
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view the slow-operation log")
+    await slow_log.flush(db)
+    filters = {}
+    if kind:
+        filters["kind"] = kind
+    if route:
+        filters["route"] = route
+    entries = await db.slow_operations.find(filters, {"profile": 0, "expires_at": 0}).sort("timestamp", -1).limit(limit).to_list(limit)
+    for entry in entries:
+        entry["_id"] = str(entry["_id"])
+    return entries
+
+@app.get("/api/admin/profiles/{profile_id}")
+async def get_request_profile(profile_id: str, user: dict = Depends(require_admin)):
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view request profiles")
+    await slow_log.flush(db)
+    entry = await db.slow_operations.find_one({"kind": "profile", "profile_id": profile_id}, {"expires_at": 0})
+    if not entry:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    entry["_id"] = str(entry["_id"])
+    return entry
+
 # ===== AUDIT LOGS =====
 
 @app.get("/api/admin/audit-logs")
-async def get_audit_logs(limit: int = 100, user: dict = Depends(require_admin)):
+async def get_audit_logs(limit: int = Query(default=100, ge=1), user: dict = Depends(require_admin)):
+    limit = min(limit, MAX_AUDIT_LOG_LIMIT)
     logs = await db.audit_logs.find({}).sort("timestamp", -1).limit(limit).to_list(limit)
     for log in logs:
         log["_id"] = str(log["_id"])
     return logs
 
-# ===== INITIALIZE DEFAULT ADMIN =====
+# ===== STARTUP & WARM-UP =====
+
+# Indexes created during warm-up and verified by the readiness probe
+REQUIRED_INDEXES = {
+    "media_library": [
+        IndexModel([("uploaded_at", -1), ("_id", -1)]),
+        IndexModel([("file_size", -1), ("_id", -1)]),
+        IndexModel([("file_name", 1), ("_id", 1)]),
+        IndexModel([("uploaded_by", 1), ("uploaded_at", -1)]),
+        IndexModel([("unreferenced_since", 1)]),
+    ],
+    "media_references": [
+        IndexModel([("file_name", 1)]),
+        IndexModel([("section", 1), ("record_id", 1)]),
+    ],
+    "audit_logs": [
+        IndexModel([("timestamp", -1)]),
+    ],
+    "audit_rollups": audit_rollups.INDEXES,
+    "slow_operations": profiling.INDEXES,
+}
+
+readiness_state: Dict[str, Any] = {"warmed_up": False, "error": None}
+
+async def ensure_indexes():
+    for collection, indexes in REQUIRED_INDEXES.items():
+        await db[collection].create_indexes(indexes)
+
+async def missing_indexes() -> List[str]:
+    missing = []
+    for collection, indexes in REQUIRED_INDEXES.items():
+        existing = {
+            tuple((field, direction if isinstance(direction, str) else int(direction)) for field, direction in info["key"])
+            for info in (await db[collection].index_information()).values()
+        }
+        for index in indexes:
+            keys = tuple(index.document["key"].items())
+            if keys not in existing:
+                missing.append(f"{collection}:{index.document['name']}")
+    return missing
 
-@app.on_event("startup")
-async def startup_event():
+async def ensure_default_admin():
     # Create default admin if not exists
     admin_exists = await db.users.find_one({"email": "admin@ahamhfc.com"})
     if not admin_exists:
@@ -790,6 +1691,75 @@ async def startup_event():
         await db.users.insert_one(admin_user)
         print("✅ Default admin user created: admin@ahamhfc.com / admin123")
 
+async def warm_up():
+    started = time.perf_counter()
+    # Wait for Mongo rather than failing the worker; readiness stays false meanwhile
+    delay = 0.5
+    while True:
+        try:
+            await db.command("ping")
+            break
+        except Exception as e:
+            readiness_state["error"] = f"Mongo unavailable: {e}"
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 10)
+
+    # The remaining steps are idempotent, so a failure (media storage still starting,
+    # a transient index build error, ...) is retried instead of leaving the worker unready
+    delay = 1.0
+    while True:
+        try:
+            await warm_up_steps()
+            break
+        except Exception as e:
+            readiness_state["error"] = f"Warm-up failed: {e}"
+            print(f"❌ Warm-up failed, retrying in {delay:.0f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60)
+
+    readiness_state["warmed_up"] = True
+    readiness_state["error"] = None
+    app.state.media_gc_task = asyncio.create_task(media_gc_loop())
+    print(f"✅ Warm-up complete in {time.perf_counter() - started:.2f}s")
+
+async def warm_up_steps():
+    await ensure_default_admin()
+    await ensure_indexes()
+    # Creates the local upload directories, or checks the bucket is reachable
+    await asyncio.to_thread(media_store.prepare)
+
+    # Media reference index; built from content on first start, then maintained incrementally
+    if await db.media_references.estimated_document_count() == 0:
+        await media_references.rebuild(db)
+
+    # Concurrent pings force the pool to open connections before traffic arrives
+    await asyncio.gather(*(db.command("ping") for _ in range(WARMUP_CONNECTIONS)))
+
+    # Pre-load public content, scorecard and EMI config
+    public_loaders = {
+        "banners": load_public_banners,
+        "products": load_public_products,
+        "testimonials": load_public_testimonials,
+        "articles": load_public_articles,
+        "about_stats": load_public_about_stats,
+        "footer": load_public_footer,
+        "emi_calculator": load_public_emi_calculator,
+    }
+    await asyncio.gather(
+        *(public_read(section, None, loader, Response()) for section, loader in public_loaders.items()),
+        refresh_eligibility_scorer(),
+        refresh_emi_defaults(),
+    )
+    defaults = emi_config_state["defaults"]
+    emi_engine.amortize(1_000_000, defaults["annual_rate"], defaults["tenure_months"])
+
+@app.on_event("startup")
+async def startup_event():
+    app.state.slow_log_task = asyncio.create_task(slow_log.run(db, SLOW_LOG_FLUSH_SECONDS))
+    app.state.loop_lag_task = asyncio.create_task(admission_control.monitor_loop_lag())
+    # Database work runs in the background so the worker can answer liveness probes immediately
+    app.state.warm_up_task = asyncio.create_task(warm_up())
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
@@ -0,0 +1,322 @@
+"""Synthetic bilingual dataset generator for load and index testing.
+
+Fills every CMS collection with realistic-looking English/Tamil records at
+scale. Documents are built from small phrase pools (so generation stays
+cheap) and written with unordered ``insert_many`` batches, several of which
+are kept in flight while the next batch is generated. Every generated
+document carries ``synthetic: true`` so ``--purge`` can remove exactly what
+was added without touching seeded or editor content.
+
+Usage:
+    python synthetic_data.py --scale 1000000                  # ~1M audit logs, 100k media, ...
+    python synthetic_data.py --counts audit_logs=5000000,articles=20000
+    python synthetic_data.py --purge
+"""
+import argparse
+import asyncio
+import os
+import random
+import secrets
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from passlib.context import CryptContext
+
+import audit_rollups
+
+MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
+# Synthetic editors can sign in to the admin panel, so unless one is set the password is random per run
+SYNTHETIC_USER_PASSWORD = os.getenv("SYNTHETIC_USER_PASSWORD")
+SYNTHETIC_IMAGE_URL = "/uploads/synthetic.webp"
+MARKER = {"synthetic": True}
+
+# Documents per collection relative to --scale; the single-record sections
+# (about_stats, footer, emi_calculator) are only generated through --counts
+DEFAULT_RATIOS = {
+    "audit_logs": 1.0,
+    "media_library": 0.1,
+    "articles": 0.01,
+    "testimonials": 0.01,
+    "users": 0.001,
+    "banners": 0.001,
+    "products": 0.001,
+    "eligibility_questions": 0.0001,
+}
+CONTENT_COLLECTIONS = ("banners", "products", "testimonials", "articles")
+
+# ===== PHRASE POOLS =====
+
+LOAN_TYPES = [
+    ("Home Construction Loan", "வீடு கட்டுமான கடன்"),
+    ("Plot + Construction Loan", "மனை + கட்டுமான கடன்"),
+    ("NRI Home Loan", "என்ஆர்ஐ வீட்டுக் கடன்"),
+    ("Home Renovation Loan", "வீடு புதுப்பித்தல் கடன்"),
+    ("Home Extension Loan", "வீடு விரிவாக்க கடன்"),
+    ("Loan Against Property", "சொத்து அடமான கடன்"),
+]
+HEADLINES = [
+    ("Own Your Dream Home", "உங்கள் கனவு வீட்டை சொந்தமாக்குங்கள்"),
+    ("Low Interest, Quick Approval", "குறைந்த வட்டி, விரைவான ஒப்புதல்"),
+    ("PMAY Subsidy Made Simple", "PMAY மானியம் எளிதாக"),
+    ("Loans Without Income Proof", "வருமானச் சான்று இல்லாமல் கடன்"),
+    ("Flexible EMI Options", "நெகிழ்வான EMI விருப்பங்கள்"),
+    ("Doorstep Service Across Tamil Nadu", "தமிழ்நாடு முழுவதும் வீட்டு வாசல் சேவை"),
+]
+SENTENCES = [
+    ("Home loan interest rates depend on your credit profile and loan tenure.",
+     "வீட்டுக் கடன் வட்டி விகிதம் உங்கள் கடன் வரலாறு மற்றும் கடன் காலத்தைப் பொறுத்தது."),
+    ("A longer tenure lowers the monthly EMI but increases the total interest paid.",
+     "நீண்ட கடன் காலம் மாதாந்திர EMI-ஐ குறைக்கிறது, ஆனால் மொத்த வட்டியை அதிகரிக்கிறது."),
+    ("Self-employed applicants can qualify using bank statements instead of salary slips.",
+     "சுயதொழில் செய்பவர்கள் சம்பளச் சீட்டுக்குப் பதிலாக வங்கி அறிக்கைகள் மூலம் தகுதி பெறலாம்."),
+    ("Prepaying part of the principal early saves the most interest.",
+     "அசல் தொகையின் ஒரு பகுதியை முன்கூட்டியே செலுத்துவது அதிக வட்டியைச் சேமிக்கிறது."),
+    ("PMAY offers an interest subsidy to eligible first-time home buyers.",
+     "தகுதியான முதல் முறை வீடு வாங்குபவர்களுக்கு PMAY வட்டி மானியம் வழங்குகிறது."),
+    ("Keep your property documents ready to speed up the approval process.",
+     "ஒப்புதல் செயல்முறையை விரைவுபடுத்த உங்கள் சொத்து ஆவணங்களைத் தயாராக வைத்திருங்கள்."),
+    ("Our field officers visit you to verify income and property details.",
+     "வருமானம் மற்றும் சொத்து விவரங்களைச் சரிபார்க்க எங்கள் அலுவலர்கள் உங்களைச் சந்திப்பார்கள்."),
+    ("Compare the effective annual rate, not just the headline interest rate.",
+     "முதன்மை வட்டி விகிதத்தை மட்டுமல்ல, பயனுள்ள ஆண்டு விகிதத்தையும் ஒப்பிடுங்கள்."),
+]
+COMMENTS = [
+    ("Smooth process and quick approval.", "சுலபமான செயல்முறை மற்றும் விரைவான ஒப்புதல்."),
+    ("The team explained every step clearly.", "குழுவினர் ஒவ்வொரு படியையும் தெளிவாக விளக்கினர்."),
+    ("Got my loan without income proof.", "வருமானச் சான்று இல்லாமல் கடன் பெற்றேன்."),
+    ("Very helpful staff and transparent charges.", "மிகவும் உதவிகரமான ஊழியர்கள், வெளிப்படையான கட்டணங்கள்."),
+]
+FIRST_NAMES = ["Arun", "Priya", "Karthik", "Lakshmi", "Suresh", "Divya", "Ravi", "Meena", "Vijay", "Anitha"]
+LAST_NAMES = ["Kumar", "Raman", "Subramanian", "Krishnan", "Pillai", "Natarajan", "Sundaram", "Iyer"]
+LOCATIONS = ["Chennai", "Madurai", "Coimbatore", "Salem", "Tiruchirappalli", "Tirunelveli", "Erode", "Vellore"]
+CTA_ACTIONS = ["enquiry", "scorecard", "pmay", "emi"]
+ICONS = ["HomeIcon", "BuildingIcon", "GlobeIcon", "WrenchIcon", "ExpandIcon", "KeyIcon"]
+GRADIENTS = ["from-blue-500 to-indigo-600", "from-green-500 to-teal-600", "from-orange-500 to-red-600"]
+FEATURES = ["Quick Approval", "No Income Proof", "Doorstep Service", "Up to 30 Years", "PMAY Eligible"]
+AUDIT_SECTIONS = ["banners", "products", "testimonials", "articles", "media", "about", "footer", "emi_calculator"]
+AUDIT_ACTIONS = ["create", "update", "update", "update", "delete"]
+EDITORS = 50  # distinct audit_logs.user_email values, like a real editorial team
+
+# ===== GENERATORS =====
+
+class Generator:
+    """Builds synthetic documents; one instance per run so keys never collide across runs."""
+
+    def __init__(self, rng: random.Random, days: int, user_password: Optional[str] = None,
+                 run: Optional[str] = None):
+        self.rng = rng
+        self.user_password = user_password or SYNTHETIC_USER_PASSWORD or secrets.token_urlsafe(12)
+        self.run = run or uuid.uuid4().hex[:8]
+        # synthetic_run lets a caller (e.g. benchmark.py) purge only the documents it generated
+        self.marker = {**MARKER, "synthetic_run": self.run}
+        self.now = datetime.now(timezone.utc)
+        self.span_seconds = days * 86400
+        self._password_hash: Optional[str] = None
+
+    def timestamp(self) -> str:
+        return (self.now - timedelta(seconds=self.rng.randrange(self.span_seconds))).isoformat()
+
+    def paragraph(self, sentences: int):
+        picked = [self.rng.choice(SENTENCES) for _ in range(sentences)]
+        return " ".join(en for en, _ in picked), " ".join(ta for _, ta in picked)
+
+    def base(self) -> Dict[str, Any]:
+        stamp = self.timestamp()
+        return {**self.marker, "status": True, "created_at": stamp, "updated_at": stamp}
+
+    def banners(self, i: int) -> Dict[str, Any]:
+        title, subtitle = self.rng.choice(HEADLINES), self.rng.choice(SENTENCES)
+        return {**self.base(), "title_en": title[0], "title_ta": title[1],
+                "subtitle_en": subtitle[0], "subtitle_ta": subtitle[1],
+                "cta_text_en": "Apply Now", "cta_text_ta": "இப்போது விண்ணப்பிக்கவும்",
+                "cta_action": self.rng.choice(CTA_ACTIONS), "image_url": SYNTHETIC_IMAGE_URL,
+                "highlights": self.rng.sample(FEATURES, 3), "order_index": 1000 + i}
+
+    def products(self, i: int) -> Dict[str, Any]:
+        title = self.rng.choice(LOAN_TYPES)
+        description = self.paragraph(2)
+        return {**self.base(), "title_en": title[0], "title_ta": title[1],
+                "description_en": description[0], "description_ta": description[1],
+                "icon": self.rng.choice(ICONS), "image_url": SYNTHETIC_IMAGE_URL,
+                "features": self.rng.sample(FEATURES, 3), "gradient": self.rng.choice(GRADIENTS),
+                "order_index": 1000 + i}
+
+    def testimonials(self, i: int) -> Dict[str, Any]:
+        comment = self.rng.choice(COMMENTS)
+        return {**self.base(), "name": f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                "location": self.rng.choice(LOCATIONS), "rating": self.rng.randint(3, 5),
+                "comment_en": comment[0], "comment_ta": comment[1], "image_url": SYNTHETIC_IMAGE_URL,
+                "loan_type": self.rng.choice(LOAN_TYPES)[0], "order_index": 1000 + i}
+
+    def articles(self, i: int) -> Dict[str, Any]:
+        title = self.rng.choice(HEADLINES)
+        content = self.paragraph(self.rng.randint(20, 60))
+        doc = self.base()
+        return {**doc, "title_en": title[0], "title_ta": title[1], "slug": f"synthetic-{self.run}-{i}",
+                "content_en": content[0], "content_ta": content[1], "thumbnail_url": SYNTHETIC_IMAGE_URL,
+                "published_date": doc["created_at"]}
+
+    def eligibility_questions(self, i: int) -> Dict[str, Any]:
+        return {**self.base(), "question_en": f"What is your monthly income? ({i})",
+                "question_ta": f"உங்கள் மாத வருமானம் என்ன? ({i})", "question_type": "select",
+                "options": ["<25000", "25000-50000", "50000+"],
+                "score_map": {"<25000": 10, "25000-50000": 20, "50000+": 30}, "order_index": 1000 + i}
+
+    def about_stats(self, i: int) -> Dict[str, Any]:
+        title, subtitle = self.rng.choice(HEADLINES), self.rng.choice(SENTENCES)
+        return {**self.base(), "title_en": title[0], "title_ta": title[1],
+                "subtitle_en": subtitle[0], "subtitle_ta": subtitle[1],
+                "features": [{"title_en": f, "title_ta": f} for f in self.rng.sample(FEATURES, 3)],
+                "stats": [{"value": str(self.rng.randint(1, 50) * 1000), "label_en": "Happy Customers",
+                           "label_ta": "மகிழ்ச்சியான வாடிக்கையாளர்கள்"}]}
+
+    def footer(self, i: int) -> Dict[str, Any]:
+        return {**self.base(), "address_en": f"{i} Anna Salai, {self.rng.choice(LOCATIONS)}",
+                "address_ta": f"{i} அண்ணா சாலை", "phone": f"+91 {self.rng.randrange(10**9, 10**10)}",
+                "email": f"contact{i}@synthetic.example", "social_links": {"facebook": "#", "instagram": "#"},
+                "copyright_en": "© AHAM Housing Finance", "copyright_ta": "© அஹம் வீட்டு நிதி"}
+
+    def emi_calculator(self, i: int) -> Dict[str, Any]:
+        return {**self.base(), "title_en": "EMI Calculator", "title_ta": "EMI கணிப்பான்",
+                "subtitle_en": "Plan your monthly payments", "subtitle_ta": "உங்கள் மாதாந்திர தவணைகளைத் திட்டமிடுங்கள்",
+                "default_interest": round(self.rng.uniform(7.5, 12.0), 2),
+                "default_tenure": self.rng.choice([120, 180, 240, 300])}
+
+    def media_library(self, i: int) -> Dict[str, Any]:
+        file_name = f"synthetic_{self.run}_{i}.webp"
+        width = self.rng.choice([640, 1024, 1280, 1920])
+        alt = self.rng.choice(HEADLINES)
+        # Never flagged as unreferenced (see media_references.NOT_SYNTHETIC); --purge removes them
+        return {**self.marker, "file_name": file_name, "url": f"/uploads/{file_name}",
+                "thumbnail_url": f"/uploads/thumbs/{file_name}", "width": width, "height": width * 9 // 16,
+                "alt_text_en": alt[0], "alt_text_ta": alt[1], "file_size": self.rng.randint(20_000, 2_000_000),
+                "uploaded_by": self.editor_email(), "uploaded_at": self.timestamp(), "unreferenced_since": None}
+
+    def users(self, i: int) -> Dict[str, Any]:
+        if self._password_hash is None:
+            # bcrypt is deliberately slow, so every synthetic user shares one hash
+            self._password_hash = CryptContext(schemes=["bcrypt"], deprecated="auto").hash(self.user_password)
+        return {**self.marker, "name": f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                "email": f"user{i}.{self.run}@synthetic.example", "password_hash": self._password_hash,
+                "role": self.rng.choice(["editor", "editor", "viewer"]), "created_at": self.timestamp(),
+                "last_login": None}
+
+    def audit_logs(self, i: int) -> Dict[str, Any]:
+        return {**self.marker, "user_email": self.editor_email(), "section": self.rng.choice(AUDIT_SECTIONS),
+                "action": self.rng.choice(AUDIT_ACTIONS), "record_id": uuid.UUID(int=self.rng.getrandbits(128)).hex[:24],
+                "old_value": None, "new_value": None, "timestamp": self.timestamp()}
+
+    def editor_email(self) -> str:
+        return f"editor{self.rng.randrange(EDITORS)}@synthetic.example"
+
+
+def collections() -> List[str]:
+    return [*DEFAULT_RATIOS, "about_stats", "footer", "emi_calculator"]
+
+# ===== WRITER =====
+
+def batched(documents: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for doc in documents:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def insert_documents(collection, documents: Iterable[Dict[str, Any]], batch_size: int, concurrency: int) -> int:
+    """Unordered insert_many batches with up to ``concurrency`` writes in flight."""
+    pending = set()
+    inserted = 0
+
+    async def insert(batch):
+        result = await collection.insert_many(batch, ordered=False)
+        return len(result.inserted_ids)
+
+    for batch in batched(documents, batch_size):
+        if len(pending) >= concurrency:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            inserted += sum(task.result() for task in done)
+        pending.add(asyncio.create_task(insert(batch)))
+        # Let in-flight inserts hand their batches to the driver while we build the next one
+        await asyncio.sleep(0)
+    if pending:
+        inserted += sum(await asyncio.gather(*pending))
+    return inserted
+
+
+async def populate(db, counts: Dict[str, int], batch_size: int = 5000, concurrency: int = 4,
+                   rng_seed: int = 42, days: int = 365,
+                   progress: Optional[Callable[[str, int, float], None]] = None,
+                   user_password: Optional[str] = None, run: Optional[str] = None) -> Dict[str, int]:
+    generator = Generator(random.Random(rng_seed), days, user_password, run)
+    inserted = {}
+    for name, count in counts.items():
+        if count <= 0:
+            continue
+        build = getattr(generator, name)
+        started = time.perf_counter()
+        inserted[name] = await insert_documents(db[name], (build(i) for i in range(count)), batch_size, concurrency)
+        if progress:
+            progress(name, inserted[name], time.perf_counter() - started)
+    if inserted.get("audit_logs"):
+        # Rollups are normally maintained by log_audit, which bulk inserts bypass
+        await audit_rollups.rebuild(db)
+    return inserted
+
+
+async def purge(db, names: Iterable[str] = (), run: Optional[str] = None) -> Dict[str, int]:
+    """Delete synthetic documents; only those of one populate() run when ``run`` is given."""
+    query = {**MARKER, "synthetic_run": run} if run else MARKER
+    deleted = {}
+    for name in names or collections():
+        result = await db[name].delete_many(query)
+        deleted[name] = result.deleted_count
+    if deleted.get("audit_logs"):
+        await audit_rollups.rebuild(db)
+    return deleted
+
+
+def resolve_counts(scale: int, overrides: str) -> Dict[str, int]:
+    counts = {name: int(scale * ratio) for name, ratio in DEFAULT_RATIOS.items()}
+    for item in filter(None, (part.strip() for part in overrides.split(","))):
+        name, _, value = item.partition("=")
+        if name not in collections():
+            raise SystemExit(f"❌ Unknown collection '{name}' (choose from {', '.join(collections())})")
+        counts[name] = int(value)
+    return counts
+
+
+def print_progress(name: str, count: int, elapsed: float):
+    print(f"✅ Inserted {count} synthetic {name} in {elapsed:.1f}s ({count / max(elapsed, 1e-9):,.0f} docs/s)")
+
+
+async def main(args):
+    db = AsyncIOMotorClient(MONGO_URL).aham_cms
+    if args.purge:
+        for name, count in (await purge(db)).items():
+            print(f"✅ Removed {count} synthetic {name}")
+        return
+    counts = resolve_counts(args.scale, args.counts)
+    user_password = SYNTHETIC_USER_PASSWORD or secrets.token_urlsafe(12)
+    inserted = await populate(db, counts, args.batch_size, args.concurrency, args.random_seed, args.days,
+                              print_progress, user_password)
+    if inserted.get("users"):
+        print(f"✅ Synthetic users sign in with password: {user_password}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic bilingual CMS data")
+    parser.add_argument("--scale", type=int, default=100000, help="audit_logs count; other collections scale from it")
+    parser.add_argument("--counts", default="", help="per-collection overrides, e.g. articles=20000,footer=1")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=4, help="insert batches kept in flight")
+    parser.add_argument("--days", type=int, default=365, help="spread timestamps over this many days")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--purge", action="store_true", help="remove every synthetic document")
+    asyncio.run(main(parser.parse_args()))
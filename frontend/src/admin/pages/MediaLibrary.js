@@ -1,54 +1,79 @@
 import React, { useState, useEffect } from 'react';
 import toast from 'react-hot-toast';
-import { apiRequest, uploadFile } from '../utils/api';
+import { apiRequest, uploadFile, uploadFiles } from '../utils/api';
 import { CloudArrowUpIcon, TrashIcon, MagnifyingGlassIcon } from '@heroicons/react/24/outline';
 
 function MediaLibrary() {
   const [mediaItems, setMediaItems] = useState([]);
   const [loading, setLoading] = useState(true);
   const [uploading, setUploading] = useState(false);
+  const [uploadProgress, setUploadProgress] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
-    loadMedia();
-  }, []);
+    // Debounce server-side filename search
+    const timer = setTimeout(() => loadMedia(), 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
+  const loadMedia = async (cursor = null) => {
+    const params = new URLSearchParams();
+    if (searchTerm) params.set('q', searchTerm);
+    if (cursor) params.set('cursor', cursor);
 
-  const loadMedia = async () => {
     try {
-      const data = await apiRequest('/api/admin/media/library');
-      setMediaItems(data);
+      const data = await apiRequest(`/api/admin/media/library?${params.toString()}`);
+      setMediaItems(cursor ? (items) => [...items, ...data.items] : data.items);
+      setNextCursor(data.next_cursor);
     } catch (error) {
       toast.error('Failed to load media library');
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
+  const loadMore = () => {
+    setLoadingMore(true);
+    loadMedia(nextCursor);
+  };
+
   const handleFileUpload = async (e) => {
-    const file = e.target.files[0];
-    if (!file) return;
+    const selected = Array.from(e.target.files);
+    if (selected.length === 0) return;
 
-    // Validate file type
-    if (!file.type.startsWith('image/')) {
-      toast.error('Please upload an image file');
-      return;
+    // Validate file type and size (2MB)
+    const files = selected.filter((file) => file.type.startsWith('image/') && file.size <= 2 * 1024 * 1024);
+    if (files.length < selected.length) {
+      toast.error(`${selected.length - files.length} file(s) skipped: images under 2MB only`);
     }
-
-    // Validate file size (2MB)
-    if (file.size > 2 * 1024 * 1024) {
-      toast.error('File size must be less than 2MB');
+    if (files.length === 0) {
+      e.target.value = '';
       return;
     }
 
     setUploading(true);
     try {
-      await uploadFile(file);
-      toast.success('Image uploaded successfully');
+      if (files.length === 1) {
+        await uploadFile(files[0]);
+        toast.success('Image uploaded successfully');
+      } else {
+        setUploadProgress({ completed: 0, total: files.length });
+        const summary = await uploadFiles(files, (event) => setUploadProgress({ completed: event.completed, total: event.total }));
+        if (summary.failed) {
+          toast.error(`${summary.uploaded} uploaded, ${summary.failed} failed`);
+        } else {
+          toast.success(`${summary.uploaded} images uploaded successfully`);
+        }
+      }
       loadMedia();
     } catch (error) {
       toast.error(error.message || 'Upload failed');
     } finally {
       setUploading(false);
+      setUploadProgress(null);
       e.target.value = '';
     }
   };
@@ -61,7 +86,7 @@ function MediaLibrary() {
       toast.success('Media deleted successfully');
       loadMedia();
     } catch (error) {
-      toast.error('Failed to delete media');
+      toast.error(error.message || 'Failed to delete media');
     }
   };
 
@@ -71,10 +96,6 @@ function MediaLibrary() {
     toast.success('URL copied to clipboard');
   };
 
-  const filteredMedia = mediaItems.filter(item =>
-    item.file_name.toLowerCase().includes(searchTerm.toLowerCase())
-  );
-
   if (loading) {
     return (
       <div className="flex items-center justify-center h-64">
@@ -92,11 +113,16 @@ function MediaLibrary() {
         </div>
         <label className="admin-btn admin-btn-primary flex items-center space-x-2 cursor-pointer">
           <CloudArrowUpIcon className="h-5 w-5" />
-          <span>{uploading ? 'Uploading...' : 'Upload Image'}</span>
+          <span>
+            {uploading
+              ? (uploadProgress ? `Uploading ${uploadProgress.completed}/${uploadProgress.total}...` : 'Uploading...')
+              : 'Upload Images'}
+          </span>
           <input
             type="file"
             data-testid="upload-media-input"
             accept="image/*"
+            multiple
             onChange={handleFileUpload}
             disabled={uploading}
             className="hidden"
@@ -119,22 +145,23 @@ function MediaLibrary() {
           </div>
         </div>
 
-        {filteredMedia.length === 0 ? (
+        {mediaItems.length === 0 ? (
           <div className="text-center py-12">
             <CloudArrowUpIcon className="h-12 w-12 text-gray-400 mx-auto mb-4" />
             <p className="text-gray-500">No media files found</p>
           </div>
         ) : (
           <div className="grid grid-cols-2 md:grid-cols-3 lg:grid-cols-4 xl:grid-cols-5 gap-4">
-            {filteredMedia.map((item) => (
+            {mediaItems.map((item) => (
               <div
                 key={item._id}
                 className="group relative border border-gray-200 rounded-lg overflow-hidden hover:border-primary-300 transition-colors"
               >
                 <div className="aspect-square bg-gray-100">
                   <img
-                    src={`${process.env.REACT_APP_BACKEND_URL}${item.url}`}
+                    src={`${process.env.REACT_APP_BACKEND_URL}${item.thumbnail_url || item.url}`}
                     alt={item.file_name}
+                    loading="lazy"
                     className="w-full h-full object-cover"
                   />
                 </div>
@@ -164,6 +191,19 @@ function MediaLibrary() {
             ))}
           </div>
         )}
+
+        {nextCursor && (
+          <div className="mt-6 text-center">
+            <button
+              onClick={loadMore}
+              data-testid="load-more-media"
+              disabled={loadingMore}
+              className="admin-btn admin-btn-secondary"
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -41,4 +41,49 @@ export const uploadFile = async (file) => {
   }
 
   return response.json();
-};
\ No newline at end of file
+};
+
+// Uploads many files in one request; onProgress receives each NDJSON progress event
+export const uploadFiles = async (files, onProgress) => {
+  const token = getToken();
+  const formData = new FormData();
+  files.forEach((file) => formData.append('files', file));
+
+  const response = await fetch(`${API_BASE}/api/admin/media/upload-batch`, {
+    method: 'POST',
+    headers: {
+      'Authorization': `Bearer ${token}`
+    },
+    body: formData
+  });
+
+  if (!response.ok || !response.body) {
+    const error = await response.json().catch(() => ({ detail: 'Upload failed' }));
+    throw new Error(error.detail || 'Upload failed');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let summary = null;
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop();
+    lines.filter(Boolean).forEach((line) => {
+      const event = JSON.parse(line);
+      if (event.event === 'done') {
+        summary = event;
+      } else if (onProgress) {
+        onProgress(event);
+      }
+    });
+  }
+
+  if (!summary) {
+    throw new Error('Upload interrupted');
+  }
+  return summary;
+};